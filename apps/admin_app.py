@@ -15,7 +15,8 @@ except Exception:
 
 from core.database import add_user, list_users, export_logs_csv
 from core.security import generate_salt, hash_pin
-from core.qr_utils import make_qr_token, generate_qr_image
+from core.qr_utils import make_qr_token, generate_qr_image, badge_filename
+from core.time_utils import format_ts
 from config.settings import EXPORT_DIR
 
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
@@ -171,7 +172,7 @@ class AdminApp:
         # --- Try adding user safely ---
         try:
             qr_token = add_user(name, role, pin)
-            generate_qr_image(qr_token, f"{name}.png")
+            generate_qr_image(qr_token, badge_filename(name, qr_token))
             messagebox.showinfo("Success", f"User '{name}' added successfully.\nQR code generated.")
             self.refresh_users()
         except sqlite3.IntegrityError:
@@ -240,7 +241,7 @@ class AdminApp:
             return
         for r in rows:
             uid, name, role, t = r
-            self.inside_text.insert("end", f"{name} ({role}) — IN since {t}\n")
+            self.inside_text.insert("end", f"{name} ({role}) — IN since {format_ts(t)}\n")
     @safe_exec
     def refresh_logs(self):
         from core.database import get_recent_logs
@@ -248,7 +249,7 @@ class AdminApp:
         self.logs_text.delete("1.0", "end")
         for r in rows:
             log_id, name, action, ts, loc = r
-            self.logs_text.insert("end", f"{log_id:04d} | {name:<20} | {action:<3} | {ts} | {loc}\n")
+            self.logs_text.insert("end", f"{log_id:04d} | {name:<20} | {action:<3} | {format_ts(ts)} | {loc}\n")
     @safe_exec
     def refresh_reports(self):
         from core.database import get_daily_counts, get_total_inside
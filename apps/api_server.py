@@ -0,0 +1,164 @@
+# apps/api_server.py
+"""
+Read-only JSON API for lobby displays and dashboards (main.py api):
+
+    GET /api/inside           users currently inside
+    GET /api/inside/total     {"total": n}
+    GET /api/logs?limit=100   most recent log entries
+    GET /api/daily?days=7     IN/OUT counts per local day
+
+Each response is built once per latest log_id and then served from memory
+with an ETag; a client sending it back in If-None-Match gets 304 Not Modified.
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from config.settings import API_HOST, API_PORT, API_CHECK_SECONDS, API_CACHE_MAX_AGE
+from core import database
+from core.time_utils import format_ts
+
+MAX_LIMIT = 1000
+MAX_DAYS = 366
+
+
+class ReadCache:
+    """
+    Encoded responses keyed by endpoint, valid while the latest log_id (and
+    the local date) stays the same. The latest log_id is read at most once per
+    <check_seconds>, and one lock makes concurrent clients share a single build.
+    """
+    def __init__(self, check_seconds: float = API_CHECK_SECONDS, max_age: float = API_CACHE_MAX_AGE):
+        self.check_seconds = check_seconds
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (version, built_at, etag, body)
+        self._version = None
+        self._checked = 0.0
+
+    def _current_version(self, now: float):
+        if self._version is None or now - self._checked >= self.check_seconds:
+            self._version = (database.latest_log_id(), date.today().isoformat())
+            self._checked = now
+        return self._version
+
+    def get(self, key, build):
+        """Return (etag, body) for <key>, calling build() only when the cached copy is stale."""
+        with self._lock:
+            now = time.monotonic()
+            version = self._current_version(now)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or now - entry[1] >= self.max_age:
+                body = json.dumps(build(), separators=(",", ":")).encode("utf-8")
+                # content hash: an unchanged rebuild keeps the ETag, so clients still get 304
+                etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+                entry = (version, now, etag, body)
+                self._entries[key] = entry
+            return entry[2], entry[3]
+
+
+# Endpoints
+def inside():
+    return [{"user_id": uid, "name": name, "role": role, "timestamp": ts, "time": format_ts(ts)}
+            for uid, name, role, ts in database.get_current_inside()]
+
+def inside_total():
+    return {"total": database.get_total_inside()}
+
+def recent_logs(limit: int):
+    return [{"log_id": log_id, "name": name, "action": action, "timestamp": ts, "time": format_ts(ts),
+             "location": location}
+            for log_id, name, action, ts, location in database.get_recent_logs(limit)]
+
+def daily_counts(days: int):
+    return [{"day": day, "in": ins, "out": outs} for day, ins, outs in database.get_daily_counts(days)]
+
+def _int_param(query, name: str, default: int, maximum: int) -> int:
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return value
+
+def route(path: str, query):
+    """(cache key, build) for a request, or None for an unknown path. Raises ValueError on bad parameters."""
+    path = path.rstrip("/")
+    if path == "/api/inside":
+        return "inside", inside
+    if path == "/api/inside/total":
+        return "inside_total", inside_total
+    if path == "/api/logs":
+        limit = _int_param(query, "limit", 100, MAX_LIMIT)
+        return f"logs:{limit}", lambda: recent_logs(limit)
+    if path == "/api/daily":
+        days = _int_param(query, "days", 7, MAX_DAYS)
+        return f"daily:{days}", lambda: daily_counts(days)
+    return None
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    cache = ReadCache()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            found = route(url.path, parse_qs(url.query))
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+        if found is None:
+            return self._send_json(404, {"error": "not found"})
+        key, build = found
+        try:
+            etag, body = self.cache.get(key, build)
+        except Exception as e:
+            from core.error_utils import log_error
+            log_error(e, "API request", path=self.path)
+            return self._send_json(500, {"error": "internal error"})
+
+        tags = [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]
+        if etag in tags or "*" in tags:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        self._send_body(200, body, etag)
+
+    def _send_json(self, status: int, payload):
+        self._send_body(status, json.dumps(payload).encode("utf-8"))
+
+    def _send_body(self, status: int, body: bytes, etag: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        # browsers must revalidate, which is the cheap 304 above
+        self.send_header("Cache-Control", "no-cache")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # displays poll every few seconds; errors go to the error log instead
+        pass
+
+
+def make_server(host: str = API_HOST, port: int = API_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
+
+def serve(host: str = API_HOST, port: int = API_PORT):
+    server = make_server(host, port)
+    print(f"JSON API on http://{host}:{server.server_port}/api/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -5,16 +5,20 @@ import threading
 import time
 import tkinter as tk
 
-from core.database import get_user_by_qr, log_access, last_action_for_user
+from core.database import get_user_for_token, log_access
+from core.presence import PresenceState
 from core.error_utils import log_error
 from core.security import verify_pin
 from core.gui_utils import PinPad, show_feedback
-from config.settings import CAMERA_INDEX
+from config.settings import (CAMERA_INDEX, MAINTENANCE_SCHEDULER, TILED_DECODE, QR_KEY_FILE,
+                             QR_ACCEPT_LEGACY_TOKENS)
 
 seen_tokens = {}
+presence = PresenceState()
 
 def process_token(qr_data):
-    user = get_user_by_qr(qr_data)
+    # forged/garbage codes are rejected here without a DB lookup
+    user = get_user_for_token(qr_data)
     if not user:
         print("[DENIED] Unknown QR code.")
         root = tk.Tk(); root.withdraw()
@@ -29,10 +33,11 @@ def process_token(qr_data):
         root.destroy()
         return
 
-    last = last_action_for_user(user_id)
+    last = presence.last_action(user_id)
 
     if last == "IN":
-        log_access(user_id, "OUT")
+        log_id, ts = log_access(user_id, "OUT")
+        presence.record(user_id, "OUT", ts)
         root = tk.Tk(); root.withdraw()
         show_feedback(True, name)
         root.destroy()
@@ -52,7 +57,8 @@ def process_token(qr_data):
         return
 
     if verify_pin(entered_pin, pin_salt, pin_hash):
-        log_access(user_id, "IN")
+        log_id, ts = log_access(user_id, "IN")
+        presence.record(user_id, "IN", ts)
         print(f"[IN] {name} logged IN")
         root = tk.Tk(); root.withdraw()
         show_feedback(True, name)
@@ -64,6 +70,13 @@ def process_token(qr_data):
         root.destroy()
 
 def scanner_loop():
+    if not QR_KEY_FILE.exists():
+        # without the issuing PC's key every signed badge would be rejected
+        if not QR_ACCEPT_LEGACY_TOKENS:
+            print(f"QR signing key file {QR_KEY_FILE} is missing; copy it from the PC that issues badges.")
+            return
+        print(f"[WARNING] QR signing key file {QR_KEY_FILE} is missing: only old-style badges "
+              "will be accepted until it is copied from the PC that issues badges.")
     try:
         cap = cv2.VideoCapture(CAMERA_INDEX)
         if not cap.isOpened():
@@ -73,6 +86,24 @@ def scanner_loop():
         log_error(e, "Opening camera")
         return
 
+    try:
+        presence.start()
+    except Exception as e:
+        log_error(e, "Loading presence state")
+        cap.release()
+        return
+
+    scheduler = None
+    if MAINTENANCE_SCHEDULER:
+        from core.maintenance import MaintenanceScheduler
+        scheduler = MaintenanceScheduler()
+        scheduler.start()
+
+    decoder = None
+    if TILED_DECODE:
+        from core.tiled_decode import TiledDecoder
+        decoder = TiledDecoder()
+
     print("Scanner ready. Press 'q' to quit.")
 
     try:
@@ -81,7 +112,8 @@ def scanner_loop():
             if not ret:
                 break
 
-            barcodes = pyzbar.decode(frame)
+            # tiled results are already merged, so each code reaches the debounce once
+            barcodes = decoder.decode(frame) if decoder else pyzbar.decode(frame)
             for barcode in barcodes:
                 qr_data = barcode.data.decode("utf-8")
                 x, y, w, h = barcode.rect
@@ -102,6 +134,11 @@ def scanner_loop():
         log_error(e, "Scanner loop crash")
 
     finally:
+        presence.stop()
+        if scheduler:
+            scheduler.stop()
+        if decoder:
+            decoder.close()
         cap.release()
         cv2.destroyAllWindows()
         
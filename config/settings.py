@@ -1,14 +1,73 @@
 # config/settings.py
+import os
 from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
-DB_PATH = PROJECT_ROOT / "data" / "security_app.db"
+# QR_ACCESS_DB points the whole app (and tools like load_test.py) at another database file
+DB_PATH = Path(os.environ.get("QR_ACCESS_DB", PROJECT_ROOT / "data" / "security_app.db"))
+# SQLite durability for writers: "FULL" syncs the WAL on every commit, so a logged
+# IN/OUT survives a power cut; "NORMAL" is faster but may lose the last commits
+DB_SYNCHRONOUS = "FULL"
 QRCODE_DIR = PROJECT_ROOT / "qrcodes"
 EXPORT_DIR = PROJECT_ROOT / "data" / "exports"
+ARCHIVE_DIR = PROJECT_ROOT / "data" / "archive"
+
+# Reports and admin analytics: "wal" reads the live DB through read-only connections,
+# "snapshot" reads a backup copy refreshed at most every REPORT_SNAPSHOT_MAX_AGE seconds
+REPORT_MODE = "wal"
+REPORT_SNAPSHOT_PATH = PROJECT_ROOT / "data" / "report_snapshot.db"
+REPORT_SNAPSHOT_MAX_AGE = 60
+
+# Access logs older than this many whole months are moved into archives
+LOG_RETENTION_MONTHS = 6
+
+# Error log: JSON lines written by a background thread, rotated by size and age
+ERROR_LOG_PATH = PROJECT_ROOT / "error_log.txt"
+ERROR_LOG_MAX_BYTES = 1_000_000
+ERROR_LOG_BACKUPS = 5
+ERROR_LOG_ROTATE_SECONDS = 24 * 60 * 60
+ERROR_LOG_RATE_WINDOW = 60      # identical errors within this many seconds are counted, not written
+ERROR_LOG_QUEUE_SIZE = 1000     # records beyond this are dropped instead of blocking the caller
+
+# Signing keys for badge tokens (keep this file out of version control);
+# QR_ACCESS_KEYS points it elsewhere, e.g. next to a scratch QR_ACCESS_DB
+QR_KEY_FILE = Path(os.environ.get("QR_ACCESS_KEYS", PROJECT_ROOT / "data" / "qr_keys.json"))
+# Accept old 64-hex badges (looked up by qr_code) until everyone has been reissued
+QR_ACCEPT_LEGACY_TOKENS = True
+
+# Badge rendering: cached QR images and printable A4 sheets (columns, rows)
+BADGE_CACHE_DIR = QRCODE_DIR / "cache"
+BADGE_BOX_SIZE = 10
+BADGE_SHEET_DPI = 300
+BADGE_SHEET_GRID = (3, 4)
+
+# Scanner keeps IN/OUT state in memory and pulls other gates' events this often
+PRESENCE_RECONCILE_SECONDS = 2
+
+# Database maintenance (main.py maintain, or the scheduler inside the scanner)
+BACKUP_DIR = PROJECT_ROOT / "data" / "backups"
+BACKUP_KEEP = 7
+MAINTENANCE_SCHEDULER = False
+MAINTENANCE_QUIET_HOURS = (2, 5)    # local hours [start, end)
+MAINTENANCE_VACUUM_PAGES = 0        # free pages released per run, 0 = all
+MAINTENANCE_MARKER = PROJECT_ROOT / "data" / ".last_maintenance"
+
+# Read-only JSON API (main.py api) for lobby displays and dashboards
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_CHECK_SECONDS = 1.0     # latest log_id is read at most this often, however many clients poll
+API_CACHE_MAX_AGE = 30      # cached responses are rebuilt after this long even without new scans
+                            # (picks up renamed or deactivated users)
 
 # Camera index (0 is default built-in webcam)
 CAMERA_INDEX = 0
 
+# Tiled decoding for high-resolution cameras: overlapping tiles decoded in a process pool
+TILED_DECODE = False
+TILED_DECODE_GRID = (3, 2)          # columns, rows
+TILED_DECODE_OVERLAP = 0.2          # fraction of a tile added on each inner edge
+TILED_DECODE_WORKERS = None         # None = one per CPU core
+
 # Security parameters for PBKDF2
 PBKDF2_ITERATIONS = 150_000
 PBKDF2_ALGO = "sha256"
@@ -0,0 +1,202 @@
+# core/archive.py
+import gzip
+import json
+import os
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+from config.settings import ARCHIVE_DIR, LOG_RETENTION_MONTHS
+from core.time_utils import to_us, month_key, format_ts
+
+MANIFEST_PATH = ARCHIVE_DIR / "manifest.json"
+
+CREATE_ARCHIVE_LOGS = """
+CREATE TABLE IF NOT EXISTS access_logs (
+    log_id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    action TEXT NOT NULL,
+    timestamp INTEGER,
+    location TEXT
+);
+"""
+
+LOG_COLUMNS = "log_id, user_id, action, timestamp, location"
+
+# local calendar month of an epoch-microsecond timestamp, matches time_utils.month_key
+MONTH_SQL = "strftime('%Y-%m', timestamp / 1000000, 'unixepoch', 'localtime')"
+DAY_SQL = "DATE(timestamp / 1000000, 'unixepoch', 'localtime')"
+
+# per-day IN/OUT totals of a month, stored in the manifest since archives never change
+DAILY_SQL = f"""
+    SELECT {DAY_SQL} AS day,
+           SUM(CASE WHEN action='IN'  THEN 1 ELSE 0 END),
+           SUM(CASE WHEN action='OUT' THEN 1 ELSE 0 END)
+    FROM access_logs
+    GROUP BY day
+"""
+
+
+# Manifest
+def load_manifest() -> dict:
+    """
+    Return the archive manifest:
+    {"cutoff": epoch microseconds or None,
+     "months": {"YYYY-MM": {..., "daily": {"YYYY-MM-DD": [ins, outs]}}}}
+    """
+    if not MANIFEST_PATH.exists():
+        return {"cutoff": None, "months": {}}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_manifest(manifest: dict):
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+
+def archive_cutoff() -> Optional[int]:
+    """Everything strictly before this timestamp lives in the archives (None = nothing archived)."""
+    return load_manifest().get("cutoff")
+
+def retention_cutoff(months: int = LOG_RETENTION_MONTHS, today: Optional[date] = None) -> int:
+    """Local midnight on the first day of the month <months> whole months before the current one."""
+    today = today or date.today()
+    index = today.year * 12 + (today.month - 1) - months
+    return to_us(date(index // 12, index % 12 + 1, 1))
+
+
+# Month files
+def _month_path(month: str) -> Path:
+    return ARCHIVE_DIR / f"access_logs_{month}.db.gz"
+
+def open_month(month: str) -> sqlite3.Connection:
+    """
+    Open an archived month as an in-memory database.
+    The archive file itself is a gzip-compressed SQLite image.
+    """
+    conn = sqlite3.connect(":memory:")
+    path = _month_path(month)
+    if path.exists():
+        with gzip.open(path, "rb") as f:
+            conn.deserialize(f.read())
+    else:
+        conn.execute(CREATE_ARCHIVE_LOGS)
+    return conn
+
+def _write_month(month: str, conn: sqlite3.Connection):
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _month_path(month)
+    tmp = path.with_suffix(".gz.tmp")
+    with gzip.open(tmp, "wb", compresslevel=9) as f:
+        f.write(conn.serialize())
+    os.replace(tmp, path)
+
+def months_in_range(start: Optional[int] = None, end: Optional[int] = None) -> List[str]:
+    """
+    Archived months (newest first) that may hold events in [start, end).
+    start/end are epoch microseconds; None means unbounded.
+    """
+    months = sorted(load_manifest()["months"], reverse=True)
+    if start is not None:
+        months = [m for m in months if m >= month_key(start)]
+    if end is not None:
+        months = [m for m in months if m <= month_key(end)]
+    return months
+
+def query_archives(sql: str, params: Tuple = (), start: Optional[int] = None,
+                   end: Optional[int] = None) -> List[Tuple]:
+    """Run <sql> against every archived month in range and concatenate the rows."""
+    rows = []
+    for month in months_in_range(start, end):
+        rows.extend(query_month(month, sql, params))
+    return rows
+
+def query_month(month: str, sql: str, params: Tuple = ()) -> List[Tuple]:
+    conn = open_month(month)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def daily_counts(start: int) -> List[Tuple[str, int, int]]:
+    """
+    (local date, ins, outs) for archived days on or after <start> (epoch microseconds).
+    Read from the manifest's daily totals; only months archived without them are opened.
+    """
+    first_day = format_ts(start, "%Y-%m-%d")
+    rows = []
+    manifest = load_manifest()["months"]
+    for month in months_in_range(start):
+        daily = manifest[month].get("daily")
+        if daily is None:
+            daily = {day: (ins, outs) for day, ins, outs in query_month(month, DAILY_SQL)}
+        rows.extend((day, ins, outs) for day, (ins, outs) in daily.items() if day >= first_day)
+    return rows
+
+
+# Retention
+def archive_old_logs(months: int = LOG_RETENTION_MONTHS) -> List[Tuple[str, int]]:
+    """
+    Move access_logs rows older than <months> whole months into per-month archives.
+    Archive files and the manifest are written before the live rows are deleted.
+    Reports read the live table only from the manifest cutoff on, so rows an
+    interrupted run left behind are never counted twice; repeating the run
+    deletes them (archived rows merge on log_id).
+    Returns list of (month, rows_moved).
+    """
+    from core.database import get_conn
+
+    cutoff = retention_cutoff(months)
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT DISTINCT {MONTH_SQL} FROM access_logs
+        WHERE timestamp < ? ORDER BY 1
+    """, (cutoff,))
+    pending = [r[0] for r in cur.fetchall()]
+
+    manifest = load_manifest()
+    moved = []
+    try:
+        for month in pending:
+            cur.execute(f"""
+                SELECT {LOG_COLUMNS} FROM access_logs
+                WHERE {MONTH_SQL} = ? AND timestamp < ?
+            """, (month, cutoff))
+            rows = cur.fetchall()
+
+            arch = open_month(month)
+            arch.executemany(f"INSERT OR IGNORE INTO access_logs ({LOG_COLUMNS}) VALUES (?, ?, ?, ?, ?)", rows)
+            arch.commit()
+            count, first, last = arch.execute(
+                "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM access_logs").fetchone()
+            daily = {day: [ins, outs] for day, ins, outs in arch.execute(DAILY_SQL)}
+            _write_month(month, arch)
+            arch.close()
+
+            manifest["months"][month] = {
+                "file": _month_path(month).name,
+                "rows": count,
+                "first": first,
+                "last": last,
+                "daily": daily,
+                "archived_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            moved.append((month, len(rows)))
+
+        if manifest.get("cutoff") is None or cutoff > manifest["cutoff"]:
+            manifest["cutoff"] = cutoff
+        _save_manifest(manifest)
+
+        cur.execute("DELETE FROM access_logs WHERE timestamp < ?", (cutoff,))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        from core.error_utils import log_error
+        log_error(e, "archive_old_logs()")
+        raise
+    finally:
+        conn.close()
+    return moved
@@ -0,0 +1,109 @@
+# core/badges.py
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.settings import BADGE_CACHE_DIR, BADGE_BOX_SIZE, BADGE_SHEET_DPI, BADGE_SHEET_GRID
+
+# A4 in millimetres
+A4_MM = (210, 297)
+MARGIN_MM = 10
+LABEL_MM = 8
+QUIET_ZONE = 4   # modules of white border; the QR spec's minimum, which decoders rely on
+
+
+def cache_path(token: str) -> Path:
+    """Cached render for <token>; keyed by token hash plus render settings."""
+    digest = hashlib.sha256(f"{token}|{BADGE_BOX_SIZE}|{QUIET_ZONE}".encode("utf-8")).hexdigest()[:24]
+    return BADGE_CACHE_DIR / f"{digest}.png"
+
+def render_badge(token: str) -> str:
+    """Render one QR image into the cache (no-op if it is already there)."""
+    path = cache_path(token)
+    if path.exists():
+        return path.as_posix()
+    import qrcode
+    path.parent.mkdir(parents=True, exist_ok=True)
+    qr = qrcode.QRCode(box_size=BADGE_BOX_SIZE, border=QUIET_ZONE)
+    qr.add_data(token)
+    qr.make(fit=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.png")
+    qr.make_image().save(tmp.as_posix())
+    os.replace(tmp, path)
+    return path.as_posix()
+
+def render_badges(tokens: Iterable[str], workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Render every token that is not cached yet, in parallel across processes.
+    Returns {token: cached png path}.
+    """
+    tokens = list(dict.fromkeys(tokens))
+    missing = [t for t in tokens if not cache_path(t).exists()]
+    if len(missing) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_badge, missing, chunksize=max(1, len(missing) // 64)))
+    else:
+        for t in missing:
+            render_badge(t)
+    return {t: cache_path(t).as_posix() for t in tokens}
+
+
+def _font(size: int):
+    from PIL import ImageFont
+    for name in ("DejaVuSans.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+def compose_sheets(badges: List[Tuple[str, str]], dpi: int = BADGE_SHEET_DPI,
+                   grid: Tuple[int, int] = BADGE_SHEET_GRID) -> list:
+    """
+    Lay out (name, token) badges on A4 pages, <grid> = (columns, rows) per page,
+    with the name printed under each code. Returns a list of PIL images.
+    """
+    from PIL import Image, ImageDraw
+
+    px = lambda mm: int(round(mm / 25.4 * dpi))
+    page_w, page_h = px(A4_MM[0]), px(A4_MM[1])
+    cols, rows = grid
+    margin, label_h = px(MARGIN_MM), px(LABEL_MM)
+    cell_w = (page_w - 2 * margin) // cols
+    cell_h = (page_h - 2 * margin) // rows
+    side = min(cell_w, cell_h - label_h) - px(4)
+    font = _font(max(12, label_h // 2))
+
+    paths = render_badges(token for _, token in badges)
+    pages = []
+    per_page = cols * rows
+    for start in range(0, len(badges), per_page):
+        page = Image.new("RGB", (page_w, page_h), "white")
+        draw = ImageDraw.Draw(page)
+        for i, (name, token) in enumerate(badges[start:start + per_page]):
+            col, row = i % cols, i // cols
+            x0 = margin + col * cell_w
+            y0 = margin + row * cell_h
+            with Image.open(paths[token]) as img:
+                qr = img.convert("RGB").resize((side, side), Image.NEAREST)
+            page.paste(qr, (x0 + (cell_w - side) // 2, y0))
+            draw.text((x0 + cell_w // 2, y0 + side + label_h // 2), name, fill="black", font=font, anchor="mm")
+        pages.append(page)
+    return pages
+
+def save_sheets(pages: list, out_path: str, dpi: int = BADGE_SHEET_DPI) -> List[str]:
+    """Write pages as one multi-page PDF (out_path ends in .pdf) or numbered PNGs."""
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if not pages:
+        return []
+    if out.suffix.lower() == ".pdf":
+        pages[0].save(out.as_posix(), save_all=True, append_images=pages[1:], resolution=dpi)
+        return [out.as_posix()]
+    written = []
+    for n, page in enumerate(pages, 1):
+        path = out.with_name(f"{out.stem}_p{n}{out.suffix or '.png'}")
+        page.save(path.as_posix(), dpi=(dpi, dpi))
+        written.append(path.as_posix())
+    return written
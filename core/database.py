@@ -1,21 +1,77 @@
 # core/database.py
+import hmac
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from typing import Optional, Tuple, List
-from config.settings import DB_PATH
+from config.settings import (DB_PATH, DB_SYNCHRONOUS, REPORT_MODE, REPORT_SNAPSHOT_PATH,
+                             REPORT_SNAPSHOT_MAX_AGE, QR_ACCEPT_LEGACY_TOKENS)
 from core.security import generate_salt, hash_pin, verify_pin
-from core.qr_utils import make_qr_token
+from core.qr_utils import make_qr_token, parse_qr_token, is_legacy_token, current_key_version
+from core.time_utils import now_us, to_us, day_start_us, format_ts
+from core import archive
 
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+_prepared = False
+_snapshot_lock = threading.Lock()
+
 def get_conn():
+    global _prepared
     try:
-        return sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(DB_PATH)
+        if not _prepared:
+            # persistent per database file: readers stop blocking the gate writers
+            conn.execute("PRAGMA journal_mode=WAL")
+            from db_init import migrate
+            migrate(conn)
+            _prepared = True
+        conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+        return conn
     except Exception as e:
         from core.error_utils import log_error
         log_error(e, "Opening database connection")
         raise
 
+def get_read_conn(path: Path = None):
+    """Read-only connection (never takes a write lock) to the live DB or <path>."""
+    path = Path(path or DB_PATH)
+    if not _prepared and path == DB_PATH:
+        get_conn().close()  # WAL + schema migrations need a writable connection once
+    try:
+        return sqlite3.connect(path.resolve().as_uri() + "?mode=ro", uri=True)
+    except Exception as e:
+        from core.error_utils import log_error
+        log_error(e, "Opening read-only database connection", path=str(path))
+        raise
+
+def refresh_report_snapshot(force: bool = False) -> bool:
+    """
+    Copy the live DB into REPORT_SNAPSHOT_PATH with the SQLite backup API
+    if the copy is older than REPORT_SNAPSHOT_MAX_AGE. Returns True if refreshed.
+    """
+    with _snapshot_lock:
+        if (not force and REPORT_SNAPSHOT_PATH.exists()
+                and time.time() - REPORT_SNAPSHOT_PATH.stat().st_mtime < REPORT_SNAPSHOT_MAX_AGE):
+            return False
+        src = get_read_conn()
+        dst = sqlite3.connect(REPORT_SNAPSHOT_PATH)
+        try:
+            # copy in steps so writers on the live DB get in between
+            src.backup(dst, pages=1024)
+        finally:
+            dst.close()
+            src.close()
+        return True
+
+def get_report_conn():
+    """Connection for reports and analytics, according to REPORT_MODE."""
+    if REPORT_MODE == "snapshot":
+        refresh_report_snapshot()
+        return get_read_conn(REPORT_SNAPSHOT_PATH)
+    return get_read_conn()
+
 
 # User management
 def add_admin(username: str, password: str):
@@ -41,14 +97,16 @@ def check_admin_credentials(username: str, password: str) -> bool:
 def add_user(name, role, pin):
     salt = generate_salt()
     pin_hash = hash_pin(pin, salt)
-    qr_token = make_qr_token()
 
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
-        "INSERT INTO users (name, role, pin_hash, pin_salt, status, qr_code) VALUES (?, ?, ?, ?, 'Active', ?)",
-        (name, role, pin_hash, salt, qr_token)
+        "INSERT INTO users (name, role, pin_hash, pin_salt, status) VALUES (?, ?, ?, ?, 'Active')",
+        (name, role, pin_hash, salt)
     )
+    # the signed token embeds the user_id, so it can only be made after the insert
+    qr_token = make_qr_token(cur.lastrowid)
+    cur.execute("UPDATE users SET qr_code = ? WHERE user_id = ?", (qr_token, cur.lastrowid))
     conn.commit()
     conn.close()
 
@@ -56,7 +114,7 @@ def add_user(name, role, pin):
 
 
 def list_users(limit: int = 100) -> List[Tuple]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute("SELECT user_id, name, role, status, created_at FROM users ORDER BY user_id DESC LIMIT ?", (limit,))
     rows = cur.fetchall()
@@ -71,6 +129,74 @@ def get_user_by_qr(qr_code: str) -> Optional[Tuple]:
     conn.close()
     return row
 
+def get_user_for_token(token: str) -> Optional[Tuple]:
+    """
+    Resolve a scanned QR payload to the same row as get_user_by_qr.
+    Signed tokens are verified without touching the DB and then looked up by
+    primary key; the stored qr_code must still match, so reissued badges stop working.
+    """
+    try:
+        parsed = parse_qr_token(token)
+    except FileNotFoundError:
+        if not QR_ACCEPT_LEGACY_TOKENS:
+            raise
+        # no signing key on this PC (yet): only old-style badges can be checked
+        parsed = None
+    if parsed is None:
+        if QR_ACCEPT_LEGACY_TOKENS and is_legacy_token(token):
+            return get_user_by_qr(token)
+        return None
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT user_id, name, role, pin_hash, pin_salt, status, qr_code FROM users WHERE user_id = ?",
+                (parsed[0],))
+    row = cur.fetchone()
+    conn.close()
+    if not row or not row[6] or not hmac.compare_digest(row[6], token):
+        return None
+    return row[:6]
+
+def reissue_qr_token(user_id: int) -> str:
+    """Give <user_id> a fresh signed token under the current key; the old badge stops working."""
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT qr_code FROM users WHERE user_id = ?", (user_id,))
+    row = cur.fetchone()
+    if not row:
+        conn.close()
+        raise ValueError(f"No user with id {user_id}")
+    parsed = parse_qr_token(row[0]) if row[0] else None
+    # issues count per key version, so a rotated key starts again at 0
+    issue = parsed[2] + 1 if parsed and parsed[1] == current_key_version() else 0
+    token = make_qr_token(user_id, issue)
+    cur.execute("UPDATE users SET qr_code = ? WHERE user_id = ?", (token, user_id))
+    conn.commit()
+    conn.close()
+    return token
+
+def users_needing_reissue(all_users: bool = False) -> List[Tuple]:
+    """(user_id, name) of users whose badge is legacy/unsigned (or every user with <all_users>)."""
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT user_id, name, qr_code FROM users ORDER BY user_id")
+    rows = cur.fetchall()
+    conn.close()
+    return [(uid, name) for uid, name, token in rows
+            if all_users or not token or parse_qr_token(token) is None]
+
+def get_badge_rows(user_ids: Optional[List[int]] = None) -> List[Tuple]:
+    """(user_id, name, qr_code) of active users with a badge, optionally limited to <user_ids>."""
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT user_id, name, qr_code FROM users "
+                "WHERE status = 'Active' AND qr_code IS NOT NULL ORDER BY name, user_id")
+    rows = cur.fetchall()
+    conn.close()
+    if user_ids is not None:
+        wanted = set(user_ids)
+        rows = [r for r in rows if r[0] in wanted]
+    return rows
+
 def get_user_by_id(user_id: int) -> Optional[Tuple]:
     conn = get_conn()
     cur = conn.cursor()
@@ -87,47 +213,95 @@ def set_user_pin(user_id: int, pin_hash: str, pin_salt: str):
     conn.close()
 
 # Logging
-def log_access(user_id: int, action: str, location: str = "Gate"):
+def log_access(user_id: int, action: str, location: str = "Gate") -> Tuple[int, int]:
+    """Insert one IN/OUT event; returns (log_id, timestamp)."""
+    ts = now_us()
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("INSERT INTO access_logs (user_id, action, location) VALUES (?, ?, ?)", (user_id, action, location))
+    cur.execute("INSERT INTO access_logs (user_id, action, timestamp, location) VALUES (?, ?, ?, ?)",
+                (user_id, action, ts, location))
+    log_id = cur.lastrowid
     conn.commit()
     conn.close()
+    return log_id, ts
 
 def last_action_for_user(user_id: int) -> Optional[str]:
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("SELECT action FROM access_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1", (user_id,))
+    cur.execute("SELECT action FROM access_logs WHERE user_id = ? ORDER BY timestamp DESC, log_id DESC LIMIT 1",
+                (user_id,))
     row = cur.fetchone()
     conn.close()
     return row[0] if row else None
 
-def export_logs_csv(path: str):
+def _range_clause(start=None, end=None):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(to_us(start))
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(to_us(end))
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return where, tuple(params)
+
+def _live_start(start, cutoff):
+    """
+    Lower bound for the live table once archives are merged in: rows before the
+    cutoff are read from the archives only, even if an interrupted archive run
+    has not deleted them from access_logs yet.
+    """
+    if cutoff is None:
+        return start
+    return cutoff if start is None else max(start, cutoff)
+
+def export_logs_csv(path: str, start=None, end=None):
+    """
+    Export access logs in [start, end) to CSV, with local-time timestamps.
+    start/end are local dates/datetimes (or ISO strings) or epoch microseconds.
+    Archived months are read as well when the range reaches past the live cutoff.
+    """
     import pandas as pd
-    conn = get_conn()
-    df = pd.read_sql_query("SELECT * FROM access_logs ORDER BY timestamp DESC", conn)
-    df.to_csv(path, index=False)
+    start_us = None if start is None else to_us(start)
+    end_us = None if end is None else to_us(end)
+    cutoff = archive.archive_cutoff()
+    where, params = _range_clause(_live_start(start_us, cutoff), end_us)
+    conn = get_report_conn()
+    df = pd.read_sql_query(f"SELECT {archive.LOG_COLUMNS} FROM access_logs{where} ORDER BY timestamp DESC, log_id DESC",
+                           conn, params=params)
     conn.close()
+    if cutoff is not None and (start_us is None or start_us < cutoff):
+        where, params = _range_clause(start_us, end_us)
+        rows = archive.query_archives(f"SELECT {archive.LOG_COLUMNS} FROM access_logs{where}", params,
+                                      start_us, end_us)
+        if rows:
+            df = pd.concat([df, pd.DataFrame(rows, columns=df.columns)], ignore_index=True)
+            df = df.sort_values(["timestamp", "log_id"], ascending=False)
+    df["timestamp"] = df["timestamp"].map(format_ts)
+    df.to_csv(path, index=False)
 
 # --- Dashboard helpers ---
+# each user's latest action: one pass over the (user_id, timestamp, action) covering index;
+# with a lone MAX(), SQLite takes the bare columns from the row holding the max
+LATEST_ACTION_SQL = """
+    SELECT user_id, action, MAX(timestamp) AS ts
+    FROM access_logs
+    GROUP BY user_id
+"""
+
 def get_current_inside():
     """
     Return list of (user_id, name, role, last_action_time)
     for users whose latest action is IN.
     """
-    conn = get_conn()
+    conn = get_report_conn()
     cur = conn.cursor()
-    cur.execute("""
-        SELECT u.user_id, u.name, u.role, MAX(l.timestamp)
-        FROM users u
-        JOIN access_logs l ON u.user_id = l.user_id
+    cur.execute(f"""
+        SELECT u.user_id, u.name, u.role, l.ts
+        FROM ({LATEST_ACTION_SQL}) l
+        JOIN users u ON u.user_id = l.user_id
         WHERE l.action = 'IN'
-        AND u.user_id NOT IN (
-            SELECT user_id FROM access_logs WHERE action='OUT'
-            AND timestamp > l.timestamp
-        )
-        GROUP BY u.user_id
-        ORDER BY MAX(l.timestamp) DESC;
+        ORDER BY l.ts DESC;
     """)
     rows = cur.fetchall()
     conn.close()
@@ -138,59 +312,85 @@ def get_recent_logs(limit=100):
     """
     Return last <limit> log entries joined with usernames.
     """
-    conn = get_conn()
+    cutoff = archive.archive_cutoff()
+    conn = get_report_conn()
     cur = conn.cursor()
     cur.execute("""
         SELECT l.log_id, u.name, l.action, l.timestamp, l.location
         FROM access_logs l
         JOIN users u ON l.user_id = u.user_id
-        ORDER BY l.timestamp DESC
+        WHERE l.timestamp >= ?
+        ORDER BY l.timestamp DESC, l.log_id DESC
         LIMIT ?;
-    """, (limit,))
+    """, (_live_start(None, cutoff) or 0, limit))
     rows = cur.fetchall()
+    if len(rows) < limit and cutoff is not None:
+        # live table ran out, continue into the archives (newest month first)
+        cur.execute("SELECT user_id, name FROM users")
+        names = dict(cur.fetchall())
+        for month in archive.months_in_range():
+            older = archive.query_month(month, """
+                SELECT log_id, user_id, action, timestamp, location FROM access_logs
+                ORDER BY timestamp DESC, log_id DESC LIMIT ?
+            """, (limit - len(rows),))
+            rows.extend((log_id, names[uid], action, ts, loc)
+                        for log_id, uid, action, ts, loc in older if uid in names)
+            if len(rows) >= limit:
+                break
     conn.close()
-    return rows
+    return rows[:limit]
+
+DAILY_COUNTS_SQL = """
+    SELECT DATE(timestamp / 1000000, 'unixepoch', 'localtime') as day,
+           SUM(CASE WHEN action='IN'  THEN 1 ELSE 0 END) as ins,
+           SUM(CASE WHEN action='OUT' THEN 1 ELSE 0 END) as outs
+    FROM access_logs
+    WHERE timestamp >= ?
+    GROUP BY day
+    ORDER BY day;
+"""
 
 def get_daily_counts(days=7):
-    """Return tuples of (date, ins, outs) for the past <days> days."""
-    conn = get_conn()
+    """Return tuples of (local date, ins, outs) for the past <days> days, oldest first."""
+    since = day_start_us(days - 1)
+    cutoff = archive.archive_cutoff()
+    conn = get_report_conn()
     cur = conn.cursor()
-    cur.execute("""
-        SELECT DATE(timestamp) as day,
-               SUM(CASE WHEN action='IN'  THEN 1 ELSE 0 END) as ins,
-               SUM(CASE WHEN action='OUT' THEN 1 ELSE 0 END) as outs
-        FROM access_logs
-        GROUP BY day
-        ORDER BY day DESC
-        LIMIT ?;
-    """, (days,))
+    cur.execute(DAILY_COUNTS_SQL, (_live_start(since, cutoff),))
     rows = cur.fetchall()
     conn.close()
-    # reverse chronological order → oldest first
-    return rows[::-1]
+    if cutoff is not None and since < cutoff:
+        counts = {day: (ins, outs) for day, ins, outs in rows}
+        # archived days come from totals kept in the manifest, no month is unpacked
+        for day, ins, outs in archive.daily_counts(since):
+            prev_in, prev_out = counts.get(day, (0, 0))
+            counts[day] = (prev_in + ins, prev_out + outs)
+        rows = [(day, *counts[day]) for day in sorted(counts)]
+    return rows
 
 def get_total_inside():
     """Return total users currently inside."""
-    conn = get_conn()
+    conn = get_report_conn()
     cur = conn.cursor()
-    cur.execute("""
-        SELECT COUNT(*) FROM (
-            SELECT u.user_id
-            FROM users u
-            JOIN access_logs l ON u.user_id = l.user_id
-            WHERE l.action='IN'
-            AND u.user_id NOT IN (
-                SELECT user_id FROM access_logs WHERE action='OUT' AND timestamp>l.timestamp
-            )
-            GROUP BY u.user_id
-        );
+    cur.execute(f"""
+        SELECT COUNT(*)
+        FROM ({LATEST_ACTION_SQL}) l
+        JOIN users u ON u.user_id = l.user_id
+        WHERE l.action = 'IN';
     """)
     total = cur.fetchone()[0]
     conn.close()
     return total
 
+def latest_log_id() -> int:
+    """Highest log_id in the report source (0 if empty); changes whenever a scan is logged."""
+    conn = get_report_conn()
+    latest = conn.execute("SELECT MAX(log_id) FROM access_logs").fetchone()[0]
+    conn.close()
+    return latest or 0
+
 def get_all_users():
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute("SELECT user_id, name, role, status FROM users ORDER BY user_id DESC")
     rows = cur.fetchall()
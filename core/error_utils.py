@@ -1,16 +1,185 @@
 # core/error_utils.py
-import traceback
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from tkinter import messagebox
+from config.settings import (ERROR_LOG_PATH, ERROR_LOG_MAX_BYTES, ERROR_LOG_BACKUPS,
+                             ERROR_LOG_ROTATE_SECONDS, ERROR_LOG_RATE_WINDOW, ERROR_LOG_QUEUE_SIZE)
 
-LOG_FILE = "error_log.txt"
+LOG_FILE = ERROR_LOG_PATH
 
-def log_error(err: Exception, context: str = ""):
-    """Save error details to a log file."""
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"\n[{datetime.now().isoformat()}] {context}\n")
-        f.write("".join(traceback.format_exception(type(err), err, err.__traceback__)))
-        f.write("\n" + "-"*60 + "\n")
+
+class _SizeAndTimeRotatingHandler(RotatingFileHandler):
+    """RotatingFileHandler that also rolls over every <interval> seconds."""
+    def __init__(self, filename, max_bytes, backups, interval):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record):
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, context, error, traceback + any context fields."""
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "context": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            err = record.exc_info[1]
+            entry["error"] = f"{type(err).__name__}: {err}"
+            entry["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RateLimitFilter(logging.Filter):
+    """
+    Drop repeats of the same error (same context, type, message and raising line)
+    within <window> seconds. The next record that gets through carries the
+    number of repeats it stands for in "suppressed".
+    """
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self.lock = threading.Lock()
+        self.seen = {}  # key -> [last_emitted, suppressed]
+
+    @staticmethod
+    def _key(record):
+        err = record.exc_info[1] if record.exc_info else None
+        where = None
+        if err is not None and err.__traceback__ is not None:
+            tb = err.__traceback__
+            while tb.tb_next:
+                tb = tb.tb_next
+            where = (tb.tb_frame.f_code.co_filename, tb.tb_lineno)
+        return (record.getMessage(), type(err).__name__, str(err), where)
+
+    def filter(self, record):
+        if not self.window:
+            return True
+        key = self._key(record)
+        now = time.monotonic()
+        with self.lock:
+            state = self.seen.get(key)
+            if state and now - state[0] < self.window:
+                state[1] += 1
+                return False
+            suppressed = state[1] if state else 0
+            self.seen[key] = [now, 0]
+            if len(self.seen) > 1000:
+                # forget keys that have been quiet for a full window
+                self.seen = {k: v for k, v in self.seen.items() if now - v[0] < self.window}
+        if suppressed:
+            record.fields = {**getattr(record, "fields", {}), "suppressed": suppressed}
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the writer thread as-is; never blocks, drops when the queue is full."""
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # in-process queue: the writer thread formats, so keep exc_info intact
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            record.fields = {**getattr(record, "fields", {}), "dropped": self.dropped}
+        try:
+            self.queue.put_nowait(record)
+            self.dropped = 0
+        except queue.Full:
+            self.dropped += 1
+
+
+_logger = None
+_listener = None
+_setup_lock = threading.Lock()
+_owner_pid = os.getpid()
+
+def _reset_after_fork():
+    # the writer thread does not survive fork(); the child builds its own logger
+    global _logger, _listener, _setup_lock
+    _logger = None
+    _listener = None
+    _setup_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _get_logger() -> logging.Logger:
+    global _logger, _listener
+    if _logger is not None:
+        return _logger
+    with _setup_lock:
+        if _logger is None:
+            LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = _SizeAndTimeRotatingHandler(LOG_FILE, ERROR_LOG_MAX_BYTES, ERROR_LOG_BACKUPS,
+                                                       ERROR_LOG_ROTATE_SECONDS)
+            file_handler.setFormatter(_JsonFormatter())
+
+            if os.getpid() == _owner_pid:
+                q = queue.Queue(maxsize=ERROR_LOG_QUEUE_SIZE)
+                handler = _NonBlockingQueueHandler(q)
+                _listener = QueueListener(q, file_handler)
+                _listener.start()
+            else:
+                # forked workers (process pools) may exit without running atexit,
+                # which would lose anything still queued: write synchronously
+                handler = file_handler
+            handler.addFilter(_RateLimitFilter(ERROR_LOG_RATE_WINDOW))
+
+            logger = logging.getLogger("qr_access_logger.errors")
+            logger.setLevel(logging.ERROR)
+            logger.propagate = False
+            for h in list(logger.handlers):
+                logger.removeHandler(h)  # inherited from the parent across fork
+            logger.addHandler(handler)
+            _logger = logger
+    return _logger
+
+def flush_error_log():
+    """Stop the writer thread after draining everything queued so far."""
+    global _logger, _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for h in _listener.handlers:
+                h.close()
+        _listener = None
+        if _logger is not None:
+            for h in list(_logger.handlers):
+                _logger.removeHandler(h)
+        _logger = None
+
+atexit.register(flush_error_log)
+
+def log_error(err: Exception, context: str = "", **fields):
+    """
+    Queue error details for the background log writer.
+    Extra keyword arguments are stored as structured context fields.
+    """
+    _get_logger().error(context, exc_info=(type(err), err, err.__traceback__), extra={"fields": fields})
 
 def safe_exec(func):
     """Decorator to auto-handle and log exceptions inside UI actions."""
@@ -0,0 +1,178 @@
+# core/maintenance.py
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional
+from config.settings import (BACKUP_DIR, BACKUP_KEEP, MAINTENANCE_QUIET_HOURS, MAINTENANCE_VACUUM_PAGES,
+                             MAINTENANCE_MARKER)
+from core import database
+
+
+def _db_bytes() -> int:
+    """Size of the database file plus its WAL."""
+    path = Path(database.DB_PATH)
+    wal = path.with_name(path.name + "-wal")
+    return sum(p.stat().st_size for p in (path, wal) if p.exists())
+
+def _step(name: str, func, results: List[dict]):
+    """Run one step, recording its duration, bytes reclaimed and outcome."""
+    before = _db_bytes()
+    t0 = time.perf_counter()
+    try:
+        detail, ok = func(), True
+    except Exception as e:
+        from core.error_utils import log_error
+        log_error(e, f"Maintenance step {name}")
+        detail, ok = f"{type(e).__name__}: {e}", False
+    results.append({
+        "step": name,
+        "ok": ok,
+        "seconds": time.perf_counter() - t0,
+        "reclaimed": before - _db_bytes(),
+        "detail": detail,
+    })
+
+
+# Steps
+def checkpoint() -> str:
+    conn = database.get_conn()
+    try:
+        busy, log_frames, moved = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    finally:
+        conn.close()
+    return f"{moved}/{log_frames} WAL frames checkpointed" + (" (busy)" if busy else "")
+
+def incremental_vacuum(pages: int = MAINTENANCE_VACUUM_PAGES, allow_full: bool = True) -> str:
+    """
+    Release free pages. The first time, the file has to be switched to
+    auto_vacuum=INCREMENTAL with one full VACUUM, which locks out writers for
+    its whole duration; without <allow_full> that run is skipped.
+    """
+    conn = database.get_conn()
+    try:
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if not allow_full:
+                return "skipped: needs a one-off full VACUUM, run 'main.py maintain'"
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return f"switched to incremental auto_vacuum (full VACUUM, {free_before} free pages released)"
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})" if pages else "PRAGMA incremental_vacuum")
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+    return f"{free_before - free_after} free pages released"
+
+def optimize() -> str:
+    conn = database.get_conn()
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            # optimize only refreshes stats that already exist
+            conn.execute("ANALYZE")
+            detail = "ANALYZE (first run)"
+        else:
+            conn.execute("PRAGMA optimize")
+            detail = "PRAGMA optimize"
+        conn.commit()
+    finally:
+        conn.close()
+    return detail
+
+def integrity_check(full: bool = False) -> str:
+    conn = database.get_read_conn()
+    try:
+        rows = conn.execute("PRAGMA integrity_check" if full else "PRAGMA quick_check").fetchall()
+    finally:
+        conn.close()
+    problems = [r[0] for r in rows if r[0] != "ok"]
+    if problems:
+        raise sqlite3.DatabaseError("; ".join(problems[:5]))
+    return "ok"
+
+def backup(keep: int = BACKUP_KEEP) -> str:
+    """Hot backup through the SQLite backup API; keeps the newest <keep> copies."""
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    name = Path(database.DB_PATH).stem
+    target = BACKUP_DIR / f"{name}_{datetime.now():%Y%m%d_%H%M%S}.db"
+    src = database.get_read_conn()
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst, pages=1024)
+    finally:
+        dst.close()
+        src.close()
+    old = sorted(BACKUP_DIR.glob(f"{name}_*.db"))[:-keep] if keep else []
+    for path in old:
+        path.unlink()
+    return f"{target.name} ({target.stat().st_size // 1024} KiB, {len(old)} old removed)"
+
+
+def run_maintenance(with_backup: bool = True, full_check: bool = False,
+                    allow_full_vacuum: bool = True) -> List[dict]:
+    """Run every step in order and return one result dict per step."""
+    results = []
+    _step("checkpoint", checkpoint, results)
+    _step("incremental_vacuum", lambda: incremental_vacuum(allow_full=allow_full_vacuum), results)
+    _step("optimize", optimize, results)
+    _step("integrity_check", lambda: integrity_check(full_check), results)
+    if with_backup:
+        _step("backup", backup, results)
+    _step("checkpoint", checkpoint, results)
+    MAINTENANCE_MARKER.parent.mkdir(parents=True, exist_ok=True)
+    MAINTENANCE_MARKER.write_text(date.today().isoformat(), encoding="utf-8")
+    return results
+
+def format_results(results: List[dict]) -> str:
+    lines = []
+    for r in results:
+        status = "ok " if r["ok"] else "ERR"
+        lines.append(f"[{status}] {r['step']:<18} {r['seconds'] * 1000:8.1f} ms  "
+                     f"{r['reclaimed'] / 1024:+9.1f} KiB reclaimed  {r['detail']}")
+    return "\n".join(lines)
+
+
+# Scheduling
+def _ran_today() -> bool:
+    try:
+        return MAINTENANCE_MARKER.read_text(encoding="utf-8").strip() == date.today().isoformat()
+    except OSError:
+        return False
+
+def in_quiet_hours(now: Optional[datetime] = None) -> bool:
+    start, end = MAINTENANCE_QUIET_HOURS
+    hour = (now or datetime.now()).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+class MaintenanceScheduler:
+    """
+    Runs run_maintenance once a day inside MAINTENANCE_QUIET_HOURS, in a daemon thread.
+    It may share the process with a scanner, so it never does the blocking full VACUUM.
+    """
+    def __init__(self, check_seconds: float = 300, with_backup: bool = True):
+        self.check_seconds = check_seconds
+        self.with_backup = with_backup
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                if in_quiet_hours() and not _ran_today():
+                    results = run_maintenance(self.with_backup, allow_full_vacuum=False)
+                    print("Database maintenance:\n" + format_results(results))
+            except Exception as e:
+                # keep the thread alive; the next check tries again
+                from core.error_utils import log_error
+                log_error(e, "Scheduled maintenance")
+            if self._stop.wait(self.check_seconds):
+                return
@@ -0,0 +1,78 @@
+# core/presence.py
+import threading
+from typing import Dict, Optional, Tuple
+from config.settings import PRESENCE_RECONCILE_SECONDS
+from core.database import get_read_conn, LATEST_ACTION_SQL
+
+
+class PresenceState:
+    """
+    Latest IN/OUT action per user, held in memory by a scanner process.
+    Loaded once at startup, updated on every local log_access and topped up
+    in the background with events written by other gates (log_id > last synced).
+    """
+    def __init__(self, reconcile_seconds: float = PRESENCE_RECONCILE_SECONDS):
+        self.reconcile_seconds = reconcile_seconds
+        self.lock = threading.Lock()
+        self.latest: Dict[int, Tuple[str, int]] = {}  # user_id -> (action, timestamp)
+        self.last_log_id = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self):
+        """Replace the state with each user's latest action from the DB."""
+        conn = get_read_conn()
+        cur = conn.cursor()
+        cur.execute(LATEST_ACTION_SQL)
+        latest = {uid: (action, ts) for uid, action, ts in cur.fetchall()}
+        cur.execute("SELECT COALESCE(MAX(log_id), 0) FROM access_logs")
+        last_log_id = cur.fetchone()[0]
+        conn.close()
+        with self.lock:
+            self.latest = latest
+            self.last_log_id = last_log_id
+
+    def reconcile(self) -> int:
+        """Apply events logged since the last sync (any gate). Returns how many were read."""
+        conn = get_read_conn()
+        cur = conn.cursor()
+        cur.execute("SELECT log_id, user_id, action, timestamp FROM access_logs WHERE log_id > ? ORDER BY log_id",
+                    (self.last_log_id,))
+        rows = cur.fetchall()
+        conn.close()
+        for log_id, user_id, action, ts in rows:
+            self.record(user_id, action, ts)
+        if rows:
+            # only advanced here, so rows other gates slip in between our own writes are not skipped
+            self.last_log_id = rows[-1][0]
+        return len(rows)
+
+    def record(self, user_id: int, action: str, ts: int):
+        """Note an event; events older than the one already held are ignored."""
+        with self.lock:
+            current = self.latest.get(user_id)
+            if current is None or ts >= current[1]:
+                self.latest[user_id] = (action, ts)
+
+    def last_action(self, user_id: int) -> Optional[str]:
+        """Same answer as database.last_action_for_user, without a query."""
+        current = self.latest.get(user_id)
+        return current[0] if current else None
+
+    def start(self):
+        """Load, then keep reconciling every <reconcile_seconds> in a daemon thread."""
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="presence-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.reconcile_seconds):
+            try:
+                self.reconcile()
+            except Exception as e:
+                from core.error_utils import log_error
+                log_error(e, "Presence reconcile")
@@ -1,24 +1,139 @@
 from pathlib import Path
-import qrcode
-from config.settings import QRCODE_DIR
+from config.settings import QRCODE_DIR, QR_KEY_FILE
+import base64
+import binascii
 import hashlib
-import time
+import hmac
+import json
+import os
+import re
 import secrets
+import shutil
+import struct
+import threading
+from typing import Optional, Tuple
 
 QRCODE_DIR.mkdir(exist_ok=True)
 
-def make_qr_token() -> str:
+# Signed badge token, 15 bytes -> 24 base32 chars (QR alphanumeric mode):
+#   key version (1) | user_id (4, big endian) | issue (1) | HMAC-SHA256 truncated (9)
+_PAYLOAD = struct.Struct(">BIB")
+_MAC_BYTES = 9
+_TOKEN_BYTES = _PAYLOAD.size + _MAC_BYTES
+TOKEN_LENGTH = 24
+
+_keys = None
+_keys_lock = threading.Lock()
+
+def _load_keys(create: bool = False, reload: bool = False) -> dict:
+    """
+    {"current": version, "keys": {"<version>": hex}} from QR_KEY_FILE, cached per process.
+    Only signing (<create>) may make a new file: a verifier without the file
+    would otherwise invent its own key and reject every badge.
+    """
+    global _keys
+    with _keys_lock:
+        if _keys is None or reload:
+            if QR_KEY_FILE.exists():
+                with open(QR_KEY_FILE, "r", encoding="utf-8") as f:
+                    _keys = json.load(f)
+            elif create and _keys is None:
+                _keys = {"current": 1, "keys": {"1": secrets.token_hex(32)}}
+                _save_keys(_keys)
+            elif _keys is None:
+                raise FileNotFoundError(f"QR signing key file {QR_KEY_FILE} is missing; "
+                                        "copy it from the PC that issues badges")
+        return _keys
+
+def current_key_version() -> int:
+    return _load_keys(create=True)["current"]
+
+def _save_keys(keys: dict):
+    QR_KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = QR_KEY_FILE.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(keys, f, indent=2)
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, QR_KEY_FILE)
+
+def rotate_qr_key() -> int:
+    """
+    Add a new signing key and make it current. Older keys stay valid for
+    verification; badges only change once they are reissued.
     """
-    Create a unique token for QR payload using random bits + timestamp.
+    # re-read first so a rotation made by another process is not lost
+    keys = _load_keys(create=True, reload=True)
+    with _keys_lock:
+        version = max(int(v) for v in keys["keys"]) + 1
+        if version > 255:
+            raise ValueError("QR key version space exhausted")
+        keys["keys"][str(version)] = secrets.token_hex(32)
+        keys["current"] = version
+        _save_keys(keys)
+    return version
+
+def _mac(key_hex: str, payload: bytes) -> bytes:
+    return hmac.new(binascii.unhexlify(key_hex), payload, hashlib.sha256).digest()[:_MAC_BYTES]
+
+def make_qr_token(user_id: int, issue: int = 0) -> str:
+    """
+    Create the signed QR payload for <user_id>. Bump <issue> to give the same
+    user a new badge that differs from (and so revokes) the previous one.
+    Issues run 0-255 per key version; wrapping would bring back revoked badges.
+    """
+    if not 0 <= issue <= 255:
+        raise ValueError(f"Badge issue {issue} for user {user_id} is out of range; "
+                         "rotate the QR key (main.py reissue --rotate-key) to start again at 0")
+    keys = _load_keys(create=True)
+    version = keys["current"]
+    payload = _PAYLOAD.pack(version, user_id, issue)
+    raw = payload + _mac(keys["keys"][str(version)], payload)
+    return base64.b32encode(raw).decode("ascii")
+
+def parse_qr_token(token: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Return (user_id, key_version, issue) for a correctly signed token,
+    None for anything forged, truncated or otherwise not ours. No DB access.
     """
-    random_part = secrets.token_hex(8)
-    base = f"{random_part}|{time.time_ns()}"
-    return hashlib.sha256(base.encode("utf-8")).hexdigest()
+    if not isinstance(token, str) or len(token) != TOKEN_LENGTH:
+        return None
+    try:
+        raw = base64.b32decode(token)
+    except (binascii.Error, ValueError):
+        return None
+    if len(raw) != _TOKEN_BYTES:
+        return None
+    payload, mac = raw[:_PAYLOAD.size], raw[_PAYLOAD.size:]
+    version, user_id, issue = _PAYLOAD.unpack(payload)
+    keys = _load_keys()
+    if str(version) not in keys["keys"] and version > max(int(v) for v in keys["keys"]):
+        # a newer key from a rotation in another process (main.py reissue --rotate-key)
+        keys = _load_keys(reload=True)
+    key_hex = keys["keys"].get(str(version))
+    if key_hex is None or not hmac.compare_digest(mac, _mac(key_hex, payload)):
+        return None
+    return user_id, version, issue
+
+def is_legacy_token(token: str) -> bool:
+    """Old-style badge: 64 hex chars (SHA-256 of random bits), only checkable in the DB."""
+    if not isinstance(token, str) or len(token) != 64:
+        return False
+    try:
+        bytes.fromhex(token)
+    except ValueError:
+        return False
+    return True
+
+def badge_filename(name: str, token: str) -> str:
+    """Per-badge file name; the token hash keeps users with the same name apart."""
+    safe = re.sub(r"[^\w.-]+", "_", name).strip("._") or "user"
+    return f"{safe}_{hashlib.sha256(token.encode('utf-8')).hexdigest()[:8]}.png"
 
 def generate_qr_image(token: str, filename: str = None) -> str:
+    from core.badges import render_badge
     if filename is None:
         filename = f"user_{token[:12]}.png"
     path = Path(QRCODE_DIR) / filename
-    img = qrcode.make(token)
-    img.save(path.as_posix())
+    # rendered once per token into the badge cache, then copied out
+    shutil.copyfile(render_badge(token), path)
     return path.as_posix()
@@ -0,0 +1,125 @@
+# core/tiled_decode.py
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+from config.settings import TILED_DECODE_GRID, TILED_DECODE_OVERLAP, TILED_DECODE_WORKERS
+
+# Same fields the scanner uses from pyzbar's Decoded; rect is (left, top, width, height) in frame pixels
+Decoded = namedtuple("Decoded", ["data", "type", "rect"])
+
+
+def tile_boxes(width: int, height: int, grid: Tuple[int, int] = TILED_DECODE_GRID,
+               overlap: float = TILED_DECODE_OVERLAP) -> List[Tuple[int, int, int, int]]:
+    """
+    Split a width x height frame into grid = (columns, rows) tiles, each grown by
+    <overlap> of a tile on every inner edge so a code cut by one border is whole
+    in a neighbour. Returns (x0, y0, x1, y1) boxes.
+    """
+    cols, rows = grid
+    tile_w, tile_h = width / cols, height / rows
+    pad_x, pad_y = int(tile_w * overlap), int(tile_h * overlap)
+    boxes = []
+    for r in range(rows):
+        for c in range(cols):
+            x0 = max(0, int(c * tile_w) - pad_x)
+            y0 = max(0, int(r * tile_h) - pad_y)
+            x1 = min(width, int((c + 1) * tile_w) + pad_x)
+            y1 = min(height, int((r + 1) * tile_h) + pad_y)
+            boxes.append((x0, y0, x1, y1))
+    return boxes
+
+def merge_results(results: List[Decoded]) -> List[Decoded]:
+    """One entry per payload; a code seen in several overlapping tiles gets the union of its boxes."""
+    merged = {}
+    for d in results:
+        if d.data not in merged:
+            merged[d.data] = d
+            continue
+        x, y, w, h = merged[d.data].rect
+        x2, y2, w2, h2 = d.rect
+        left, top = min(x, x2), min(y, y2)
+        right, bottom = max(x + w, x2 + w2), max(y + h, y2 + h2)
+        merged[d.data] = d._replace(rect=(left, top, right - left, bottom - top))
+    return list(merged.values())
+
+
+# Worker side: the frame is read straight out of shared memory, never pickled
+_attached = {}
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = _attached.get(name)
+    if shm is None:
+        for old in _attached.values():
+            old.close()
+        _attached.clear()
+        try:
+            # the parent owns and unlinks the segment
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            # older Pythons register it again with the resource tracker the pool shares with the parent
+            shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+def _decode_tile(name: str, shape: Tuple[int, int], box: Tuple[int, int, int, int]) -> List[Decoded]:
+    from pyzbar import pyzbar
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=_attach(name).buf)
+    x0, y0, x1, y1 = box
+    found = []
+    for b in pyzbar.decode(frame[y0:y1, x0:x1]):
+        left, top, width, height = b.rect
+        found.append(Decoded(b.data, b.type, (left + x0, top + y0, width, height)))
+    return found
+
+
+class TiledDecoder:
+    """
+    Decode QR codes in large frames by splitting them into overlapping tiles
+    handled by a process pool. Each frame is converted to grayscale directly into
+    a shared-memory buffer that the workers read in place.
+    """
+    def __init__(self, grid: Tuple[int, int] = TILED_DECODE_GRID, overlap: float = TILED_DECODE_OVERLAP,
+                 workers: int = TILED_DECODE_WORKERS):
+        self.grid = grid
+        self.overlap = overlap
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        self.shm = None
+        self.shape = None
+        self.boxes = []
+
+    def _ensure_buffer(self, shape: Tuple[int, int]):
+        if self.shape == shape:
+            return
+        self._release()
+        self.shm = shared_memory.SharedMemory(create=True, size=shape[0] * shape[1])
+        self.shape = shape
+        self.boxes = tile_boxes(shape[1], shape[0], self.grid, self.overlap)
+
+    def decode(self, frame) -> List[Decoded]:
+        """Drop-in for pyzbar.decode(frame): merged, de-duplicated results in frame coordinates."""
+        shape = frame.shape[:2]
+        self._ensure_buffer(shape)
+        gray = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+        if frame.ndim == 3:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        else:
+            gray[:] = frame
+        futures = [self.pool.submit(_decode_tile, self.shm.name, shape, box) for box in self.boxes]
+        # the buffer is reused for the next frame only after every tile is done
+        return merge_results([d for f in futures for d in f.result()])
+
+    def _release(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+            self.shape = None
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self._release()
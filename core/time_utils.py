@@ -0,0 +1,51 @@
+# core/time_utils.py
+# access_logs.timestamp is stored as integer epoch microseconds (UTC);
+# local time only appears when something is shown to a person.
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional, Union
+
+_last_us = 0
+_lock = threading.Lock()
+
+def now_us() -> int:
+    """Current time in epoch microseconds, strictly increasing within this process."""
+    global _last_us
+    with _lock:
+        us = time.time_ns() // 1000
+        if us <= _last_us:
+            us = _last_us + 1
+        _last_us = us
+        return us
+
+def to_us(value: Union[int, str, date, datetime]) -> int:
+    """
+    Convert a local date/datetime (or 'YYYY-MM-DD[ HH:MM[:SS]]' string) to epoch microseconds.
+    Integers are assumed to already be epoch microseconds.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return int(value.timestamp()) * 1_000_000 + value.microsecond
+
+def from_us(us: int) -> datetime:
+    """Epoch microseconds -> naive local datetime."""
+    return datetime.fromtimestamp(us // 1_000_000) + timedelta(microseconds=us % 1_000_000)
+
+def format_ts(us: Optional[int], fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+    """Render epoch microseconds as local time for display."""
+    if us is None:
+        return ""
+    return from_us(us).strftime(fmt)
+
+def day_start_us(days_ago: int = 0) -> int:
+    """Local midnight <days_ago> days before today, in epoch microseconds."""
+    return to_us(date.today() - timedelta(days=days_ago))
+
+def month_key(us: int) -> str:
+    """'YYYY-MM' of the local month containing <us>."""
+    return from_us(us).strftime("%Y-%m")
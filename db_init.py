@@ -1,6 +1,7 @@
 # db_init.py
 from pathlib import Path
 import sqlite3
+from config.settings import DB_PATH
 
 PROJECT_ROOT = Path(__file__).parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -11,7 +12,7 @@ DATA_DIR.mkdir(exist_ok=True)
 QRC_DIR.mkdir(exist_ok=True)
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
-DB_PATH = DATA_DIR / "security_app.db"
+DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 CREATE_ADMINS = """
 CREATE TABLE IF NOT EXISTS admins (
@@ -36,24 +37,66 @@ CREATE TABLE IF NOT EXISTS users (
 );
 """
 
+# timestamp is epoch microseconds (UTC); the app supplies it, the default is a millisecond fallback
 CREATE_LOGS = """
-CREATE TABLE IF NOT EXISTS access_logs (
+CREATE TABLE IF NOT EXISTS {table} (
     log_id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER,
     action TEXT CHECK(action IN ('IN','OUT')) NOT NULL,
-    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    timestamp INTEGER NOT NULL DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)),
     location TEXT,
     FOREIGN KEY (user_id) REFERENCES users(user_id)
 );
 """
 
+CREATE_LOG_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp ON access_logs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_access_logs_user_time_action ON access_logs(user_id, timestamp, action);
+"""
+
+# bump when a migration is added below
+SCHEMA_VERSION = 2
+
+def migrate(conn: sqlite3.Connection):
+    """Bring an existing database up to SCHEMA_VERSION (tracked in PRAGMA user_version)."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    if version < 1:
+        # v1: DATETIME text timestamps -> integer epoch microseconds
+        columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(access_logs)")}
+        if columns.get("timestamp", "").upper() != "INTEGER":
+            conn.executescript(f"""
+                BEGIN;
+                {CREATE_LOGS.format(table="access_logs_v1")}
+                INSERT INTO access_logs_v1 (log_id, user_id, action, timestamp, location)
+                    SELECT log_id, user_id, action,
+                           CASE WHEN typeof(timestamp) = 'integer' THEN timestamp
+                                ELSE COALESCE(CAST(strftime('%s', timestamp) AS INTEGER), 0) * 1000000
+                           END,
+                           location
+                    FROM access_logs;
+                DROP TABLE access_logs;
+                ALTER TABLE access_logs_v1 RENAME TO access_logs;
+                COMMIT;
+            """)
+    if version < 2:
+        # v2: (user_id, timestamp) index widened to cover action, so latest-action lookups never touch the table
+        conn.execute("DROP INDEX IF EXISTS idx_access_logs_user_time")
+    conn.executescript(CREATE_LOG_INDEXES)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
 def init_db():
     conn = sqlite3.connect(DB_PATH.as_posix())
     cur = conn.cursor()
+    # WAL lets report readers run alongside the gate writers
+    cur.execute("PRAGMA journal_mode=WAL")
     cur.execute(CREATE_ADMINS)
     cur.execute(CREATE_USERS)
-    cur.execute(CREATE_LOGS)
+    cur.execute(CREATE_LOGS.format(table="access_logs"))
     conn.commit()
+    migrate(conn)
     conn.close()
     print(f"Initialized DB at {DB_PATH}")
 
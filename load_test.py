@@ -0,0 +1,178 @@
+# load_test.py
+"""
+Load generator for the database layer.
+
+Creates N synthetic users through add_user, then runs M simulated gates that
+each replay the scanner's sequence (get_user_for_token -> last_action_for_user ->
+verify_pin -> log_access) with bursty arrivals, and reports throughput,
+latency percentiles and error rates.
+
+Always runs against a scratch database, never data/security_app.db:
+
+    python load_test.py --users 500 --gates 8 --duration 60
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+
+def create_users(count: int, workers: int = 8):
+    """Add <count> users with random 4-6 digit PINs; returns [(qr_token, pin)]."""
+    from core.database import add_user
+
+    def make(i):
+        pin = str(random.randint(0, 999_999)).zfill(random.choice((4, 5, 6)))
+        return add_user(f"Load User {i:06d}", random.choice(("Staff", "Student", "Visitor")), pin), pin
+
+    # PBKDF2 dominates here and releases the GIL, so threads are enough
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make, range(count)))
+
+
+def scan_once(token: str, pin: str, location: str, wrong_pin: bool, presence=None) -> str:
+    """
+    One scan exactly as apps.scanner_app.process_token does it, minus the UI.
+    With <presence> the IN/OUT decision comes from memory, as in the scanner;
+    without it, from last_action_for_user.
+    """
+    from core.database import get_user_for_token, last_action_for_user, log_access
+    from core.security import verify_pin
+
+    user = get_user_for_token(token)
+    if not user:
+        return "unknown"
+    user_id, name, role, pin_hash, pin_salt, status = user
+    if status != "Active":
+        return "inactive"
+    last = presence.last_action(user_id) if presence else last_action_for_user(user_id)
+    if last == "IN":
+        log_id, ts = log_access(user_id, "OUT", location)
+        if presence:
+            presence.record(user_id, "OUT", ts)
+        return "OUT"
+    entered = "x" + pin if wrong_pin else pin
+    if not verify_pin(entered, pin_salt, pin_hash):
+        return "denied"
+    log_id, ts = log_access(user_id, "IN", location)
+    if presence:
+        presence.record(user_id, "IN", ts)
+    return "IN"
+
+
+def run_gate(gate_id: int, users: list, duration: float, max_burst: int, mean_gap: float,
+             wrong_pin_rate: float, seed: int, use_presence: bool = False) -> dict:
+    """
+    Simulate one gate for <duration> seconds: groups of 1..max_burst people
+    scan back to back, then the gate idles for an exponential gap.
+    """
+    presence = None
+    if use_presence:
+        from core.presence import PresenceState
+        presence = PresenceState()
+        presence.start()
+    rng = random.Random(seed)
+    location = f"Gate {gate_id}"
+    latencies, outcomes, errors = [], Counter(), Counter()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for _ in range(rng.randint(1, max_burst)):
+            token, pin = rng.choice(users)
+            t0 = time.perf_counter()
+            try:
+                outcomes[scan_once(token, pin, location, rng.random() < wrong_pin_rate, presence)] += 1
+                latencies.append(time.perf_counter() - t0)
+            except sqlite3.Error as e:
+                errors[f"{type(e).__name__}: {e}"] += 1
+        if mean_gap > 0:
+            time.sleep(rng.expovariate(1 / mean_gap))
+    if presence:
+        presence.stop()
+    return {"latencies": latencies, "outcomes": outcomes, "errors": errors}
+
+
+def summarize(results: list, elapsed: float) -> dict:
+    latencies = sorted(l for r in results for l in r["latencies"])
+    outcomes = sum((r["outcomes"] for r in results), Counter())
+    errors = sum((r["errors"] for r in results), Counter())
+    ok = len(latencies)
+    failed = sum(errors.values())
+    summary = {
+        "scans": ok + failed,
+        "throughput": ok / elapsed if elapsed else 0.0,
+        "error_rate": failed / (ok + failed) if ok + failed else 0.0,
+        "outcomes": dict(outcomes),
+        "errors": dict(errors),
+    }
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        summary.update(p50=cuts[49], p95=cuts[94], p99=cuts[98], max=latencies[-1])
+    return summary
+
+
+def print_summary(summary: dict, gates: int, elapsed: float):
+    print(f"\n{summary['scans']} scans from {gates} gate(s) in {elapsed:.1f}s")
+    print(f"  throughput : {summary['throughput']:.1f} scans/s")
+    if "p50" in summary:
+        print("  latency    : p50 {:.1f} ms | p95 {:.1f} ms | p99 {:.1f} ms | max {:.1f} ms".format(
+            *(summary[k] * 1000 for k in ("p50", "p95", "p99", "max"))))
+    print(f"  error rate : {summary['error_rate']:.2%}")
+    print("  outcomes   : " + ", ".join(f"{k}={v}" for k, v in sorted(summary["outcomes"].items())))
+    for err, count in sorted(summary["errors"].items(), key=lambda kv: -kv[1]):
+        print(f"  {count:>6} x {err}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the QR Access Logger database layer")
+    parser.add_argument("--users", type=int, default=200, help="synthetic users to create")
+    parser.add_argument("--gates", type=int, default=4, help="concurrent simulated gates")
+    parser.add_argument("--duration", type=float, default=30, help="seconds each gate runs")
+    parser.add_argument("--burst", type=int, default=5, help="max people arriving together")
+    parser.add_argument("--gap", type=float, default=0.5, help="mean idle seconds between bursts")
+    parser.add_argument("--wrong-pin-rate", type=float, default=0.02, help="fraction of IN scans with a bad PIN")
+    parser.add_argument("--threads", action="store_true",
+                        help="run gates as threads of one process instead of separate processes")
+    parser.add_argument("--presence", action="store_true",
+                        help="decide IN/OUT from in-memory PresenceState like the scanner does")
+    parser.add_argument("--db", type=Path, default=None,
+                        help="scratch database file (default: a new temporary file)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    db_path = args.db or Path(tempfile.mkdtemp(prefix="qr_load_")) / "load_test.db"
+    # must be set before core.* is imported so every gate process sees them;
+    # add_user signs badges, which would otherwise create the real data/qr_keys.json
+    os.environ["QR_ACCESS_DB"] = str(db_path)
+    os.environ["QR_ACCESS_KEYS"] = str(db_path.with_name(db_path.stem + "_qr_keys.json"))
+    from config.settings import DB_PATH, QR_KEY_FILE
+    data_dir = Path(__file__).resolve().parent / "data"
+    if DB_PATH.resolve() == data_dir / "security_app.db" or QR_KEY_FILE.resolve() == data_dir / "qr_keys.json":
+        parser.error("refusing to load test the production database")
+    from db_init import init_db
+    init_db()
+
+    random.seed(args.seed)
+    t0 = time.perf_counter()
+    users = create_users(args.users)
+    print(f"Created {len(users)} users in {time.perf_counter() - t0:.1f}s")
+
+    executor = ThreadPoolExecutor if args.threads else ProcessPoolExecutor
+    t0 = time.perf_counter()
+    with executor(max_workers=args.gates) as pool:
+        futures = [pool.submit(run_gate, g + 1, users, args.duration, args.burst, args.gap,
+                               args.wrong_pin_rate, args.seed + g, args.presence) for g in range(args.gates)]
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - t0
+
+    print_summary(summarize(results, elapsed), args.gates, elapsed)
+    print(f"Database: {db_path} (badge keys: {QR_KEY_FILE})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,97 @@
 # main.py
 import argparse
+import time
 from db_init import init_db
 from apps.admin_app import AdminApp
 from apps import scanner_app
 
 def main():
     parser = argparse.ArgumentParser(description="QR Access Logger")
-    parser.add_argument("mode", nargs='?', choices=["admin", "scanner", "init"], default="admin",
-                        help="Mode to run: admin (GUI admin), scanner (camera scanner), init (create DB)")
+    parser.add_argument("mode", nargs='?', choices=["admin", "scanner", "init", "archive", "reissue", "badges",
+                                                   "maintain", "api"],
+                        default="admin",
+                        help="Mode to run: admin (GUI admin), scanner (camera scanner), init (create DB), "
+                             "archive (move old logs into monthly archives), "
+                             "reissue (new signed badges for users with old-style QR codes), "
+                             "badges (printable A4 badge sheets), "
+                             "maintain (checkpoint, vacuum, optimize, integrity check, backup), "
+                             "api (read-only JSON API for dashboards)")
+    parser.add_argument("--months", type=int, default=None,
+                        help="archive: keep this many whole months of logs in the live DB")
+    parser.add_argument("--all", action="store_true",
+                        help="reissue: reissue every user's badge, not just old-style ones")
+    parser.add_argument("--rotate-key", action="store_true",
+                        help="reissue: sign with a new QR key first (implies --all)")
+    parser.add_argument("--out", default=None,
+                        help="badges: output .pdf (multi-page) or .png (one file per page)")
+    parser.add_argument("--ids", default=None,
+                        help="badges: comma-separated user ids (default: all active users)")
+    parser.add_argument("--no-backup", action="store_true", help="maintain: skip the hot backup")
+    parser.add_argument("--full-check", action="store_true",
+                        help="maintain: full integrity_check instead of quick_check")
+    parser.add_argument("--schedule", action="store_true",
+                        help="maintain: keep running and maintain daily during quiet hours")
+    parser.add_argument("--host", default=None, help="api: address to listen on (default API_HOST)")
+    parser.add_argument("--port", type=int, default=None, help="api: port to listen on (default API_PORT)")
     args = parser.parse_args()
     if args.mode == "init":
         init_db()
         return
+    if args.mode == "archive":
+        from core.archive import archive_old_logs
+        from config.settings import LOG_RETENTION_MONTHS
+        months = LOG_RETENTION_MONTHS if args.months is None else args.months
+        moved = archive_old_logs(months)
+        for month, count in moved:
+            print(f"Archived {count} log(s) from {month}")
+        if not moved:
+            print(f"Nothing older than {months} month(s) to archive.")
+        return
+    if args.mode == "reissue":
+        from core.database import users_needing_reissue, reissue_qr_token
+        from core.qr_utils import rotate_qr_key, generate_qr_image, badge_filename
+        from core.badges import render_badges
+        if args.rotate_key:
+            print(f"Signing with new QR key version {rotate_qr_key()}")
+        users = users_needing_reissue(all_users=args.all or args.rotate_key)
+        tokens = [(user_id, name, reissue_qr_token(user_id)) for user_id, name in users]
+        render_badges(token for _, _, token in tokens)
+        for user_id, name, token in tokens:
+            path = generate_qr_image(token, badge_filename(name, token))
+            print(f"{user_id:>5}  {name:<30} {path}")
+        print(f"Reissued {len(users)} badge(s). Run 'main.py badges' for printable sheets.")
+        return
+    if args.mode == "maintain":
+        from core.maintenance import run_maintenance, format_results, MaintenanceScheduler
+        if args.schedule:
+            scheduler = MaintenanceScheduler(with_backup=not args.no_backup)
+            scheduler.start()
+            print("Maintenance scheduler running. Ctrl+C to stop.")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                scheduler.stop()
+            return
+        results = run_maintenance(with_backup=not args.no_backup, full_check=args.full_check)
+        print(format_results(results))
+        return
+    if args.mode == "api":
+        from apps.api_server import serve
+        from config.settings import API_HOST, API_PORT
+        serve(args.host or API_HOST, API_PORT if args.port is None else args.port)
+        return
+    if args.mode == "badges":
+        from core.database import get_badge_rows
+        from core.badges import compose_sheets, save_sheets
+        from config.settings import EXPORT_DIR
+        ids = [int(i) for i in args.ids.split(",")] if args.ids else None
+        rows = get_badge_rows(ids)
+        pages = compose_sheets([(name, token) for _, name, token in rows])
+        for path in save_sheets(pages, args.out or (EXPORT_DIR / "badges.pdf").as_posix()):
+            print(f"Wrote {path}")
+        print(f"{len(rows)} badge(s) on {len(pages)} page(s).")
+        return
     if args.mode == "admin":
         from apps.login_window import LoginWindow
         login = LoginWindow()
@@ -0,0 +1,121 @@
+# synth_db.py
+"""
+Build a realistic synthetic database for benchmarks and experiments.
+
+Users arrive in the morning and leave in the evening on most weekdays, a few
+come in at weekends, some step out for lunch and a handful are still inside
+at the end. ~1M log rows (2000 users x 180 days) build in a few seconds:
+
+    python synth_db.py data/synthetic.db --users 2000 --days 180 --gates 4
+"""
+import argparse
+import hashlib
+import random
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from core.security import generate_salt, hash_pin
+from core.time_utils import to_us
+
+SYNTHETIC_PIN = "1234"
+ROLES = ("Staff", "Student", "Visitor", "Contractor")
+
+
+def synthetic_token(user_id: int) -> str:
+    """Legacy-style 64-hex badge; no signing keys are touched."""
+    return hashlib.sha256(f"synthetic-{user_id}".encode("utf-8")).hexdigest()
+
+def _day_events(rng: random.Random, day: date, users: int, gates: int, last_day: bool):
+    weekend = day.weekday() >= 5
+    midnight = to_us(day)
+    hour = 3_600_000_000
+    events = []
+    for uid in range(1, users + 1):
+        if rng.random() > (0.15 if weekend else 0.85):
+            continue
+        arrive = midnight + int(rng.gauss(8.5, 0.75) * hour)
+        leave = midnight + int(rng.gauss(17.0, 1.0) * hour)
+        arrive = max(midnight, min(arrive, midnight + 20 * hour))
+        leave = max(arrive + hour // 4, min(leave, midnight + 23 * hour))
+        gate = f"Gate {rng.randint(1, gates)}"
+        events.append((uid, "IN", arrive + rng.randrange(1_000_000), gate))
+        if rng.random() < 0.3:
+            lunch = midnight + int(rng.gauss(12.5, 0.4) * hour)
+            if arrive < lunch < leave - hour:
+                events.append((uid, "OUT", lunch, gate))
+                events.append((uid, "IN", lunch + rng.randint(20, 60) * 60_000_000, gate))
+        # on the last day a few people are still inside
+        if not (last_day and rng.random() < 0.05):
+            events.append((uid, "OUT", leave + rng.randrange(1_000_000), f"Gate {rng.randint(1, gates)}"))
+    events.sort(key=lambda e: e[2])
+    return events
+
+def build_database(path, users: int = 500, days: int = 30, gates: int = 4, seed: int = 1,
+                   end: date = None) -> int:
+    """
+    Create (or replace) a database at <path> with <users> users and <days> days
+    of access logs ending yesterday (or <end>). Returns the number of log rows.
+    """
+    from db_init import CREATE_ADMINS, CREATE_USERS, CREATE_LOGS, migrate
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        p = path.with_name(path.name + suffix)
+        if p.exists():
+            p.unlink()
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(CREATE_ADMINS)
+    conn.execute(CREATE_USERS)
+    conn.execute(CREATE_LOGS.format(table="access_logs"))
+
+    # one PBKDF2 hash shared by everyone; hashing per user would dominate the build
+    salt = generate_salt()
+    pin_hash = hash_pin(SYNTHETIC_PIN, salt)
+    created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO users (user_id, name, role, qr_code, pin_hash, pin_salt, status, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ((uid, f"User {uid:06d}", rng.choice(ROLES), synthetic_token(uid), pin_hash, salt,
+          "Active" if rng.random() > 0.02 else "Inactive", created) for uid in range(1, users + 1)))
+
+    end = end or date.today() - timedelta(days=1)
+    rows = 0
+    for n in range(days):
+        day = end - timedelta(days=days - 1 - n)
+        events = _day_events(rng, day, users, gates, last_day=(n == days - 1))
+        conn.executemany("INSERT INTO access_logs (user_id, action, timestamp, location) VALUES (?, ?, ?, ?)",
+                         events)
+        rows += len(events)
+    conn.commit()
+
+    # indexes are built once at the end, then the file is switched to normal operation
+    migrate(conn)
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic QR Access Logger database")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--gates", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    rows = build_database(args.path, args.users, args.days, args.gates, args.seed)
+    print(f"{args.path}: {args.users} users, {rows} log rows in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
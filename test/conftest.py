@@ -0,0 +1,22 @@
+# tests/conftest.py
+import pytest
+import db_init
+from core import database, error_utils, qr_utils
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """
+    Point core.database at a fresh, initialised database file, with its own
+    QR signing key and error log.
+    """
+    path = tmp_path / "test.db"
+    error_utils.flush_error_log()
+    monkeypatch.setattr(error_utils, "LOG_FILE", tmp_path / "error_log.txt")
+    monkeypatch.setattr(qr_utils, "QR_KEY_FILE", tmp_path / "qr_keys.json")
+    monkeypatch.setattr(qr_utils, "_keys", None)
+    monkeypatch.setattr(db_init, "DB_PATH", path)
+    monkeypatch.setattr(database, "DB_PATH", path)
+    monkeypatch.setattr(database, "_prepared", False)
+    db_init.init_db()
+    yield path
+    error_utils.flush_error_log()
@@ -0,0 +1,51 @@
+# tests/test_api_server.py
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from apps import api_server
+from core import database
+
+@pytest.fixture
+def api(tmp_db, monkeypatch):
+    monkeypatch.setattr(api_server.ApiHandler, "cache", api_server.ReadCache(check_seconds=0))
+    server = api_server.make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+def _get(url, etag=None):
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as resp:
+            return resp.status, resp.headers.get("ETag"), json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("ETag"), None
+
+def test_etag_and_cache_follow_latest_log(api, monkeypatch):
+    database.add_user("Ada", "Staff", "1234")
+    uid = database.get_all_users()[0][0]
+    database.log_access(uid, "IN", "Gate 1")
+    calls = []
+    real = database.get_current_inside
+    monkeypatch.setattr(database, "get_current_inside", lambda: calls.append(1) or real())
+
+    status, etag, body = _get(api + "/api/inside")
+    assert status == 200 and [u["name"] for u in body] == ["Ada"]
+    assert _get(api + "/api/inside", etag)[0] == 304
+    assert _get(api + "/api/inside")[0] == 200
+    assert len(calls) == 1  # served from memory until a new log arrives
+
+    database.log_access(uid, "OUT", "Gate 1")
+    status, new_etag, body = _get(api + "/api/inside", etag)
+    assert status == 200 and body == [] and new_etag != etag
+    assert len(calls) == 2
+    assert _get(api + "/api/inside/total")[2] == {"total": 0}
+    assert [log["action"] for log in _get(api + "/api/logs?limit=5")[2]] == ["OUT", "IN"]
+
+def test_bad_requests(api):
+    assert _get(api + "/api/logs?limit=abc")[0] == 400
+    assert _get(api + "/api/daily?days=0")[0] == 400
+    assert _get(api + "/api/nope")[0] == 404
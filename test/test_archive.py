@@ -0,0 +1,99 @@
+# tests/test_archive.py
+import sqlite3
+from datetime import date, datetime, timedelta
+import pytest
+from core import archive, database
+from core.time_utils import to_us
+
+def test_retention_cutoff():
+    assert archive.retention_cutoff(6, date(2026, 10, 19)) == to_us("2026-04-01")
+    assert archive.retention_cutoff(12, date(2026, 1, 31)) == to_us("2025-01-01")
+    assert archive.retention_cutoff(0, date(2026, 3, 2)) == to_us("2026-03-01")
+
+def test_month_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path)
+    monkeypatch.setattr(archive, "MANIFEST_PATH", tmp_path / "manifest.json")
+    conn = archive.open_month("2025-01")
+    conn.execute("INSERT INTO access_logs VALUES (1, 7, 'IN', ?, 'Gate')", (to_us("2025-01-03 08:00"),))
+    conn.commit()
+    archive._write_month("2025-01", conn)
+    archive._save_manifest({"cutoff": to_us("2025-02-01"), "months": {"2025-01": {}}})
+
+    assert archive.archive_cutoff() == to_us("2025-02-01")
+    assert archive.months_in_range(to_us("2025-02-01")) == []
+    rows = archive.query_archives("SELECT user_id, action FROM access_logs", (), to_us("2025-01-01"))
+    assert rows == [(7, "IN")]
+
+def _fill_logs(tmp_db, monkeypatch, tmp_path):
+    """Point the archive at tmp_path and log one IN/OUT pair every 3 days for ~8 months."""
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(archive, "MANIFEST_PATH", tmp_path / "archive" / "manifest.json")
+    conn = sqlite3.connect(tmp_db)
+    conn.execute("INSERT INTO users (user_id, name, role, pin_hash, pin_salt, status) "
+                 "VALUES (1, 'Ada', 'Staff', 'x', 'x', 'Active')")
+    today = date.today()
+    for n in range(1, 240, 3):
+        day = datetime.combine(today - timedelta(days=n), datetime.min.time())
+        conn.execute("INSERT INTO access_logs (user_id, action, timestamp, location) VALUES (1, 'IN', ?, 'Gate')",
+                     (to_us(day + timedelta(hours=8)),))
+        conn.execute("INSERT INTO access_logs (user_id, action, timestamp, location) VALUES (1, 'OUT', ?, 'Gate')",
+                     (to_us(day + timedelta(hours=17)),))
+    conn.commit()
+    conn.close()
+
+def test_reports_merge_archived_months(tmp_db, tmp_path, monkeypatch):
+    _fill_logs(tmp_db, monkeypatch, tmp_path)
+    recent, daily = database.get_recent_logs(1000), database.get_daily_counts(366)
+
+    moved = archive.archive_old_logs(2)
+    assert moved and sum(n for _, n in moved) < len(recent)
+    assert archive.archive_cutoff() == archive.retention_cutoff(2)
+
+    def no_unpacking(month):
+        raise AssertionError(f"{month} unpacked for daily counts")
+    with monkeypatch.context() as m:
+        m.setattr(archive, "open_month", no_unpacking)
+        assert database.get_daily_counts(366) == daily
+    assert database.get_recent_logs(1000) == recent
+    assert database.get_recent_logs(5) == recent[:5]
+
+def test_export_merges_archived_months(tmp_db, tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    _fill_logs(tmp_db, monkeypatch, tmp_path)
+    database.export_logs_csv(str(tmp_path / "before.csv"))
+    conn = sqlite3.connect(tmp_db)
+    conn.execute("CREATE TRIGGER no_delete BEFORE DELETE ON access_logs BEGIN SELECT RAISE(ABORT, 'locked'); END")
+    conn.commit()
+    with pytest.raises(sqlite3.DatabaseError):
+        archive.archive_old_logs(2)
+    database.export_logs_csv(str(tmp_path / "interrupted.csv"))
+    conn.execute("DROP TRIGGER no_delete")
+    conn.commit()
+    conn.close()
+    archive.archive_old_logs(2)
+    database.export_logs_csv(str(tmp_path / "after.csv"))
+    before = pd.read_csv(tmp_path / "before.csv")
+    assert before.equals(pd.read_csv(tmp_path / "interrupted.csv"))
+    assert before.equals(pd.read_csv(tmp_path / "after.csv"))
+
+def test_failed_delete_does_not_double_count(tmp_db, tmp_path, monkeypatch):
+    _fill_logs(tmp_db, monkeypatch, tmp_path)
+    recent, daily = database.get_recent_logs(1000), database.get_daily_counts(366)
+    conn = sqlite3.connect(tmp_db)
+    conn.execute("CREATE TRIGGER no_delete BEFORE DELETE ON access_logs BEGIN SELECT RAISE(ABORT, 'locked'); END")
+    conn.commit()
+
+    with pytest.raises(sqlite3.DatabaseError):
+        archive.archive_old_logs(2)
+    # manifest is written, live rows are still there
+    assert archive.archive_cutoff() == archive.retention_cutoff(2)
+    assert conn.execute("SELECT COUNT(*) FROM access_logs").fetchone()[0] == len(recent)
+    assert database.get_daily_counts(366) == daily
+    assert database.get_recent_logs(1000) == recent
+
+    conn.execute("DROP TRIGGER no_delete")
+    conn.commit()
+    conn.close()
+    archive.archive_old_logs(2)
+    assert database.get_daily_counts(366) == daily
+    assert database.get_recent_logs(1000) == recent
@@ -0,0 +1,40 @@
+# tests/test_badges.py
+import pytest
+from core import badges
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(badges, "BADGE_CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
+
+def test_cache_path_follows_token_and_settings(cache_dir, monkeypatch):
+    path = badges.cache_path("TOKEN-A")
+    assert path.parent == cache_dir
+    assert badges.cache_path("TOKEN-A") == path
+    assert badges.cache_path("TOKEN-B") != path
+    for setting in ("BADGE_BOX_SIZE", "QUIET_ZONE"):
+        with monkeypatch.context() as m:
+            m.setattr(badges, setting, getattr(badges, setting) + 1)
+            assert badges.cache_path("TOKEN-A") != path
+
+def test_render_badges_skips_cached_tokens(cache_dir):
+    pytest.importorskip("qrcode")
+    pytest.importorskip("PIL")
+    cached = badges.cache_path("CACHED")
+    cached.parent.mkdir(parents=True)
+    cached.write_bytes(b"already rendered")
+
+    paths = badges.render_badges(["CACHED", "NEW", "NEW"], workers=1)
+    assert set(paths) == {"CACHED", "NEW"}
+    assert cached.read_bytes() == b"already rendered"
+    assert badges.cache_path("NEW").read_bytes().startswith(b"\x89PNG")
+
+def test_compose_sheets_page_count(cache_dir):
+    pytest.importorskip("qrcode")
+    pytest.importorskip("PIL")
+    grid = (2, 2)
+    people = [(f"User {n}", f"TOKEN{n}") for n in range(9)]
+    pages = badges.compose_sheets(people, dpi=50, grid=grid)
+    assert len(pages) == 3  # 4 + 4 + 1
+    assert len(badges.compose_sheets(people[:4], dpi=50, grid=grid)) == 1
+    assert badges.compose_sheets([], dpi=50, grid=grid) == []
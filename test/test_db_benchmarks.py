@@ -0,0 +1,172 @@
+# tests/test_db_benchmarks.py
+"""
+Timing benchmarks for every public core.database function (report connections
+in both REPORT_MODEs) on synthetic data (see synth_db.py). Slow, so skipped
+unless QR_BENCH is set:
+
+    QR_BENCH=1 python -m pytest -q -s test/test_db_benchmarks.py
+
+QR_BENCH_USERS / QR_BENCH_DAYS ("15,60,240") choose the data sizes and
+QR_BENCH_REPORT=<file.json> saves timings and query plans. Each function fails
+if its time grows faster than its allowed exponent of the access_logs row count.
+"""
+import itertools
+import json
+import math
+import os
+import time
+from pathlib import Path
+import pytest
+from core import database, qr_utils
+from synth_db import build_database, synthetic_token, SYNTHETIC_PIN
+
+pytestmark = pytest.mark.skipif(not os.environ.get("QR_BENCH"), reason="set QR_BENCH=1 to run benchmarks")
+
+USERS = int(os.environ.get("QR_BENCH_USERS", 1000))
+DAYS = [int(d) for d in os.environ.get("QR_BENCH_DAYS", "15,60,240").split(",")]
+REPEATS = 5
+FLOOR_SECONDS = 50e-6   # below this, timings are noise
+
+CONSTANT, LINEAR = 0.35, 1.25
+
+_deleted = itertools.count(USERS, -1)  # delete_user needs a different existing user per call
+
+def _snapshot_mode(func):
+    """Run <func> with REPORT_MODE = "snapshot" and a snapshot file per benchmark database."""
+    def call(tmp):
+        saved = database.REPORT_MODE, database.REPORT_SNAPSHOT_PATH
+        database.REPORT_MODE = "snapshot"
+        database.REPORT_SNAPSHOT_PATH = tmp / f"{Path(database.DB_PATH).stem}_snapshot.db"
+        try:
+            return func()
+        finally:
+            database.REPORT_MODE, database.REPORT_SNAPSHOT_PATH = saved
+    return call
+
+# name -> (call, allowed growth exponent of time vs. log rows)
+CASES = {
+    "get_user_by_qr": (lambda tmp: database.get_user_by_qr(synthetic_token(USERS // 2)), CONSTANT),
+    "get_user_for_token": (lambda tmp: database.get_user_for_token(synthetic_token(USERS // 2)), CONSTANT),
+    "get_user_by_id": (lambda tmp: database.get_user_by_id(USERS // 2), CONSTANT),
+    "last_action_for_user": (lambda tmp: database.last_action_for_user(USERS // 2), CONSTANT),
+    "log_access": (lambda tmp: database.log_access(USERS // 2, "IN", "Bench"), CONSTANT),
+    "get_recent_logs": (lambda tmp: database.get_recent_logs(100), CONSTANT),
+    "get_daily_counts": (lambda tmp: database.get_daily_counts(7), CONSTANT),
+    "list_users": (lambda tmp: database.list_users(100), CONSTANT),
+    "get_all_users": (lambda tmp: database.get_all_users(), CONSTANT),
+    "get_badge_rows": (lambda tmp: database.get_badge_rows(), CONSTANT),
+    "users_needing_reissue": (lambda tmp: database.users_needing_reissue(), CONSTANT),
+    "check_admin_credentials": (lambda tmp: database.check_admin_credentials("bench", SYNTHETIC_PIN), CONSTANT),
+    "add_user": (lambda tmp: database.add_user("Bench User", "Staff", SYNTHETIC_PIN), CONSTANT),
+    "update_user": (lambda tmp: database.update_user(USERS // 3, "Renamed", "Staff"), CONSTANT),
+    "set_user_status": (lambda tmp: database.set_user_status(USERS // 3, "Active"), CONSTANT),
+    "set_user_pin": (lambda tmp: database.set_user_pin(USERS // 3, "0" * 64, "0" * 32), CONSTANT),
+    "add_admin": (lambda tmp: database.add_admin("bench", SYNTHETIC_PIN), CONSTANT),
+    "delete_user": (lambda tmp: database.delete_user(next(_deleted)), CONSTANT),
+    "reissue_qr_token": (lambda tmp: database.reissue_qr_token(USERS // 4), CONSTANT),
+    "latest_log_id": (lambda tmp: database.latest_log_id(), CONSTANT),
+    "get_report_conn_snapshot": (_snapshot_mode(lambda: database.get_report_conn().close()), CONSTANT),
+    "refresh_report_snapshot": (_snapshot_mode(lambda: database.refresh_report_snapshot(force=True)), LINEAR),
+    "get_current_inside": (lambda tmp: database.get_current_inside(), LINEAR),
+    "get_total_inside": (lambda tmp: database.get_total_inside(), LINEAR),
+    "export_logs_csv": (lambda tmp: database.export_logs_csv(str(tmp / "all.csv")), LINEAR),
+    "export_logs_csv_last_week": (
+        lambda tmp: database.export_logs_csv(str(tmp / "week.csv"), start=database.day_start_us(6)), CONSTANT),
+}
+NEEDS_PANDAS = {"export_logs_csv", "export_logs_csv_last_week"}
+
+
+def _point_at(path):
+    database.DB_PATH = path
+    database._prepared = False
+
+def _traced(factory, statements):
+    def wrapper(*args, **kwargs):
+        conn = factory(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+    return wrapper
+
+def _time(call, tmp) -> float:
+    call(tmp)  # warm caches
+    best = math.inf
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        call(tmp)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _plans(statements, path) -> list:
+    _point_at(path)
+    conn = database.get_read_conn()
+    plans = []
+    for sql in dict.fromkeys(s.strip() for s in statements):
+        if not sql.upper().startswith(("SELECT", "WITH")):
+            continue
+        detail = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        plans.append({"sql": " ".join(sql.split()), "plan": detail})
+    conn.close()
+    return plans
+
+
+@pytest.fixture(scope="module")
+def bench(tmp_path_factory):
+    """Build one database per size, time every case on each and collect query plans."""
+    original = database.DB_PATH, qr_utils.QR_KEY_FILE
+    root = tmp_path_factory.mktemp("bench")
+    qr_utils.QR_KEY_FILE = root / "qr_keys.json"  # add_user signs badges
+    sizes, results = [], {}
+    try:
+        for days in DAYS:
+            path = root / f"synthetic_{days}d.db"
+            rows = build_database(path, users=USERS, days=days)
+            _point_at(path)
+            database.add_admin("bench", SYNTHETIC_PIN)
+            sizes.append((rows, path))
+
+        for name, (call, allowed) in CASES.items():
+            if name in NEEDS_PANDAS:
+                try:
+                    import pandas  # noqa: F401
+                except ImportError:
+                    continue
+            timings, statements = [], []
+            for rows, path in sizes:
+                _point_at(path)
+                with pytest.MonkeyPatch.context() as mp:
+                    for factory in ("get_conn", "get_read_conn", "get_report_conn"):
+                        mp.setattr(database, factory, _traced(getattr(database, factory), statements))
+                    timings.append(_time(call, root))
+            (small_rows, _), (large_rows, large_path) = sizes[0], sizes[-1]
+            growth = (math.log(max(timings[-1], FLOOR_SECONDS) / max(timings[0], FLOOR_SECONDS))
+                      / math.log(large_rows / small_rows))
+            results[name] = {
+                "rows": [r for r, _ in sizes],
+                "seconds": timings,
+                "growth": growth,
+                "allowed": allowed,
+                "plans": _plans(statements, large_path),
+            }
+    finally:
+        _point_at(original[0])
+        qr_utils.QR_KEY_FILE = original[1]
+
+    print(f"\n{'function':<28}" + "".join(f"{r:>12,} rows" for r, _ in sizes) + "   growth")
+    for name, r in results.items():
+        print(f"{name:<28}" + "".join(f"{t * 1000:>14.2f} ms" for t in r["seconds"])
+              + f"   {r['growth']:.2f} (max {r['allowed']})")
+    report = os.environ.get("QR_BENCH_REPORT")
+    if report:
+        with open(report, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_query_growth(bench, name):
+    if name not in bench:
+        pytest.skip("pandas not installed")
+    r = bench[name]
+    plans = "\n".join(f"  {p['sql']}\n    " + "\n    ".join(p["plan"]) for p in r["plans"])
+    assert r["growth"] <= r["allowed"], (
+        f"{name} grows as rows^{r['growth']:.2f} (allowed {r['allowed']}):\n{plans}")
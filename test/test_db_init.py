@@ -0,0 +1,34 @@
+# tests/test_db_init.py
+import sqlite3
+from db_init import migrate, SCHEMA_VERSION
+from core.time_utils import to_us, format_ts, now_us
+
+def test_migrate_text_timestamps_to_epoch_us():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""CREATE TABLE access_logs (
+        log_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER,
+        action TEXT CHECK(action IN ('IN','OUT')) NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, location TEXT)""")
+    conn.execute("INSERT INTO access_logs (user_id, action, timestamp, location) "
+                 "VALUES (1, 'IN', '2025-10-24 01:58:39', 'Gate')")
+    conn.commit()
+
+    migrate(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert conn.execute("SELECT timestamp FROM access_logs").fetchone()[0] == 1761271119 * 1_000_000
+    # new rows still get an integer default
+    conn.execute("INSERT INTO access_logs (user_id, action) VALUES (1, 'OUT')")
+    assert conn.execute("SELECT typeof(timestamp) FROM access_logs WHERE log_id = 2").fetchone()[0] == "integer"
+    migrate(conn)  # idempotent
+
+def test_time_helpers():
+    a, b = now_us(), now_us()
+    assert b > a
+    assert format_ts(to_us("2025-10-24 08:30:15")) == "2025-10-24 08:30:15"
+
+def test_read_conn_with_relative_db_path(tmp_db, monkeypatch):
+    from pathlib import Path
+    from core import database
+    monkeypatch.chdir(tmp_db.parent)
+    monkeypatch.setattr(database, "DB_PATH", Path(tmp_db.name))
+    assert database.get_all_users() == []
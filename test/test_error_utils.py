@@ -0,0 +1,45 @@
+# tests/test_error_utils.py
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from core import error_utils
+
+def _raise(msg):
+    try:
+        raise RuntimeError(msg)
+    except RuntimeError as e:
+        return e
+
+def test_log_error_rate_limits_repeats(tmp_path, monkeypatch):
+    log_file = tmp_path / "errors.log"
+    monkeypatch.setattr(error_utils, "LOG_FILE", log_file)
+    error_utils.flush_error_log()
+
+    for _ in range(50):
+        error_utils.log_error(_raise("camera lost"), "Reading frame", camera=0)
+    error_utils.log_error(_raise("disk full"), "Writing export")
+    error_utils.flush_error_log()
+
+    records = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [r["context"] for r in records] == ["Reading frame", "Writing export"]
+    assert records[0]["camera"] == 0
+    assert records[0]["error"] == "RuntimeError: camera lost"
+    assert "Traceback" in records[0]["traceback"]
+
+def _log_in_worker(n):
+    error_utils.log_error(_raise(f"worker {n}"), "Pool worker")
+    return n
+
+def test_log_error_from_forked_pool_workers(tmp_path, monkeypatch):
+    log_file = tmp_path / "errors.log"
+    monkeypatch.setattr(error_utils, "LOG_FILE", log_file)
+    error_utils.flush_error_log()
+    error_utils.log_error(_raise("parent"), "Parent")  # listener running before the fork
+
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=2, mp_context=ctx) as pool:
+        assert sorted(pool.map(_log_in_worker, range(4))) == [0, 1, 2, 3]
+    error_utils.flush_error_log()
+
+    errors = sorted(json.loads(line)["error"] for line in log_file.read_text(encoding="utf-8").splitlines())
+    assert errors == ["RuntimeError: parent"] + [f"RuntimeError: worker {n}" for n in range(4)]
@@ -0,0 +1,49 @@
+# tests/test_maintenance.py
+import time
+from datetime import datetime
+from core import database, maintenance
+
+def test_run_maintenance(tmp_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(maintenance, "BACKUP_DIR", tmp_path / "backups")
+    monkeypatch.setattr(maintenance, "MAINTENANCE_MARKER", tmp_path / ".last_maintenance")
+    for i in range(200):
+        database.log_access(i, "IN")
+    conn = database.get_conn()
+    conn.execute("DELETE FROM access_logs")
+    conn.commit()
+    conn.close()
+
+    results = maintenance.run_maintenance()
+    assert [r["step"] for r in results] == ["checkpoint", "incremental_vacuum", "optimize",
+                                            "integrity_check", "backup", "checkpoint"]
+    assert all(r["ok"] for r in results), maintenance.format_results(results)
+    assert len(list((tmp_path / "backups").glob("*.db"))) == 1
+    assert maintenance._ran_today()
+
+def test_quiet_hours(monkeypatch):
+    monkeypatch.setattr(maintenance, "MAINTENANCE_QUIET_HOURS", (23, 4))
+    assert maintenance.in_quiet_hours(datetime(2026, 1, 1, 2))
+    assert not maintenance.in_quiet_hours(datetime(2026, 1, 1, 12))
+
+def test_scheduler_skips_full_vacuum_and_survives_errors(tmp_db, tmp_path, monkeypatch):
+    assert maintenance.incremental_vacuum(allow_full=False).startswith("skipped")
+    conn = database.get_conn()
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+    conn.close()
+
+    calls, logged = [], []
+    def failing_run(*args, **kwargs):
+        calls.append(kwargs)
+        raise OSError("marker not writable")
+    monkeypatch.setattr(maintenance, "run_maintenance", failing_run)
+    monkeypatch.setattr(maintenance, "in_quiet_hours", lambda: True)
+    monkeypatch.setattr("core.error_utils.log_error", lambda e, context="", **f: logged.append(context))
+    scheduler = maintenance.MaintenanceScheduler(check_seconds=0.01, with_backup=False)
+    scheduler.start()
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+    assert len(calls) >= 2  # still running after the first failure
+    assert calls[0]["allow_full_vacuum"] is False
+    assert "Scheduled maintenance" in logged
@@ -0,0 +1,21 @@
+# tests/test_presence.py
+from core import database
+from core.presence import PresenceState
+
+def test_presence_matches_database(tmp_db):
+    database.log_access(1, "IN")
+    database.log_access(2, "IN")
+    database.log_access(1, "OUT")
+
+    state = PresenceState()
+    state.load()
+    for uid in (1, 2, 3):
+        assert state.last_action(uid) == database.last_action_for_user(uid)
+
+    # local write, then another gate's write picked up by reconcile
+    state.record(2, "OUT", database.log_access(2, "OUT")[1])
+    database.log_access(1, "IN", "Gate 2")
+    assert state.last_action(1) == "OUT"
+    assert state.reconcile() == 2
+    assert state.last_action(1) == "IN"
+    assert state.last_action(2) == "OUT"
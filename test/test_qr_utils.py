@@ -0,0 +1,73 @@
+# tests/test_qr_utils.py
+import sqlite3
+import pytest
+from core import qr_utils
+
+def _use_tmp_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(qr_utils, "QR_KEY_FILE", tmp_path / "qr_keys.json")
+    monkeypatch.setattr(qr_utils, "_keys", None)
+
+def test_token_roundtrip(tmp_path, monkeypatch):
+    _use_tmp_keys(tmp_path, monkeypatch)
+    token = qr_utils.make_qr_token(42, issue=3)
+    assert len(token) == qr_utils.TOKEN_LENGTH
+    assert token.isalnum() and token.isupper()
+    assert qr_utils.parse_qr_token(token) == (42, 1, 3)
+
+def test_rejects_forged_and_garbage(tmp_path, monkeypatch):
+    _use_tmp_keys(tmp_path, monkeypatch)
+    token = qr_utils.make_qr_token(42)
+    flipped = token[:-1] + ("A" if token[-1] != "A" else "B")
+    assert qr_utils.parse_qr_token(flipped) is None
+    assert qr_utils.parse_qr_token("hello world") is None
+    assert qr_utils.parse_qr_token("1" * qr_utils.TOKEN_LENGTH) is None
+    assert qr_utils.is_legacy_token("ab" * 32)
+    assert not qr_utils.is_legacy_token(token)
+
+def test_old_key_still_verifies_after_rotation(tmp_path, monkeypatch):
+    _use_tmp_keys(tmp_path, monkeypatch)
+    old = qr_utils.make_qr_token(7)
+    assert qr_utils.rotate_qr_key() == 2
+    new = qr_utils.make_qr_token(7)
+    assert new != old
+    assert qr_utils.parse_qr_token(old) == (7, 1, 0)
+    assert qr_utils.parse_qr_token(new) == (7, 2, 0)
+
+def test_picks_up_key_rotated_by_another_process(tmp_path, monkeypatch):
+    _use_tmp_keys(tmp_path, monkeypatch)
+    qr_utils.make_qr_token(7)
+    stale = {"current": 1, "keys": dict(qr_utils._keys["keys"])}
+    qr_utils.rotate_qr_key()
+    new = qr_utils.make_qr_token(7)
+    monkeypatch.setattr(qr_utils, "_keys", stale)  # this process still has only key 1 cached
+    assert qr_utils.parse_qr_token(new) == (7, 2, 0)
+
+def test_verifier_never_creates_keys(tmp_path, monkeypatch):
+    _use_tmp_keys(tmp_path, monkeypatch)
+    token = qr_utils.make_qr_token(7)
+    qr_utils.QR_KEY_FILE.unlink()
+    monkeypatch.setattr(qr_utils, "_keys", None)
+    with pytest.raises(FileNotFoundError):
+        qr_utils.parse_qr_token(token)
+    assert not qr_utils.QR_KEY_FILE.exists()
+
+def test_issue_does_not_wrap(tmp_path, monkeypatch):
+    _use_tmp_keys(tmp_path, monkeypatch)
+    assert qr_utils.parse_qr_token(qr_utils.make_qr_token(7, issue=255)) == (7, 1, 255)
+    with pytest.raises(ValueError):
+        qr_utils.make_qr_token(7, issue=256)
+
+def test_lookup_without_key_file_accepts_legacy_only(tmp_db, monkeypatch):
+    from core import database
+    conn = sqlite3.connect(tmp_db)
+    conn.execute("INSERT INTO users (user_id, name, role, qr_code, pin_hash, pin_salt, status) "
+                 "VALUES (1, 'Ada', 'Staff', ?, 'x', 'x', 'Active')", ("ab" * 32,))
+    conn.commit()
+    conn.close()
+    assert not qr_utils.QR_KEY_FILE.exists()
+    assert database.get_user_for_token("ab" * 32)[1] == "Ada"
+    assert database.get_user_for_token("A" * qr_utils.TOKEN_LENGTH) is None
+    assert not qr_utils.QR_KEY_FILE.exists()
+    monkeypatch.setattr(database, "QR_ACCEPT_LEGACY_TOKENS", False)
+    with pytest.raises(FileNotFoundError):
+        database.get_user_for_token("A" * qr_utils.TOKEN_LENGTH)
@@ -0,0 +1,28 @@
+# tests/test_synth_db.py
+import sqlite3
+from core import database
+from core.presence import PresenceState
+from db_init import SCHEMA_VERSION
+from synth_db import build_database
+
+def test_build_and_presence_queries(tmp_path, monkeypatch):
+    path = tmp_path / "synthetic.db"
+    rows = build_database(path, users=40, days=5, gates=2, seed=3)
+    monkeypatch.setattr(database, "DB_PATH", path)
+    monkeypatch.setattr(database, "_prepared", False)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM access_logs").fetchone()[0] == rows > 0
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    # latest action per user, worked out the slow way
+    expected = {}
+    for uid, action in conn.execute("SELECT user_id, action FROM access_logs ORDER BY timestamp, log_id"):
+        expected[uid] = action
+    conn.close()
+    inside = {uid for uid, action in expected.items() if action == "IN"}
+
+    assert {r[0] for r in database.get_current_inside()} == inside
+    assert database.get_total_inside() == len(inside)
+    state = PresenceState()
+    state.load()
+    assert all(state.last_action(uid) == action for uid, action in expected.items())
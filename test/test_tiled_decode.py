@@ -0,0 +1,34 @@
+# tests/test_tiled_decode.py
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+from core.tiled_decode import Decoded, tile_boxes, merge_results
+
+def test_tile_boxes_cover_frame_with_clamped_overlap():
+    width, height = 101, 57
+    boxes = tile_boxes(width, height, grid=(3, 2), overlap=0.2)
+    assert len(boxes) == 6
+    for x0, y0, x1, y1 in boxes:
+        assert 0 <= x0 < x1 <= width and 0 <= y0 < y1 <= height
+    covered = {(x, y) for x0, y0, x1, y1 in boxes for x in range(x0, x1) for y in range(y0, y1)}
+    assert len(covered) == width * height
+    # outer edges are clamped to the frame, inner edges reach into the neighbour
+    assert boxes[0][:2] == (0, 0) and boxes[-1][2:] == (width, height)
+    assert boxes[0][2] > boxes[1][0] and boxes[0][3] > boxes[3][1]
+
+def test_tile_boxes_without_overlap_partition_frame():
+    boxes = tile_boxes(100, 50, grid=(2, 1), overlap=0)
+    assert boxes == [(0, 0, 50, 50), (50, 0, 100, 50)]
+
+def test_merge_results_unions_boxes_per_payload():
+    results = [
+        Decoded(b"A", "QRCODE", (10, 10, 20, 20)),
+        Decoded(b"B", "QRCODE", (100, 5, 10, 10)),
+        Decoded(b"A", "QRCODE", (15, 5, 30, 10)),
+    ]
+    merged = {d.data: d for d in merge_results(results)}
+    assert len(merged) == 2
+    assert merged[b"A"].rect == (10, 5, 35, 25)
+    assert merged[b"B"].rect == (100, 5, 10, 10)
+    assert merge_results([]) == []